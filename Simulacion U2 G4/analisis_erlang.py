@@ -0,0 +1,114 @@
+"""Aproximación analítica M/M/s (Erlang C) para el sistema de cajas."""
+
+import math
+
+from analizador_costos import AnalizadorCostos
+
+
+def tiempo_servicio_medio(config):
+    """Tiempo medio de servicio en minutos (artículos y cobro uniformes)."""
+    articulos_medios = (config["articulos_min"] + config["articulos_max"]) / 2
+    cobro_medio = (config["t_cobro_min"] + config["t_cobro_max"]) / 2
+    return (articulos_medios * config["t_scan_normal"] + cobro_medio) / 60
+
+
+def probabilidad_espera(num_cajas, carga):
+    """Fórmula de Erlang C: probabilidad de que un cliente tenga que esperar.
+
+    Se calcula con la recursión de Erlang B, que es numéricamente estable
+    para cargas grandes. Retorna 1 si el sistema es inestable (carga >= s).
+    """
+    if carga >= num_cajas:
+        return 1.0
+    erlang_b = 1.0
+    for k in range(1, num_cajas + 1):
+        erlang_b = carga * erlang_b / (k + carga * erlang_b)
+    return num_cajas * erlang_b / (num_cajas - carga * (1 - erlang_b))
+
+
+def probabilidad_tiempo_sistema(num_cajas, lambda_llegadas, mu, umbral):
+    """P(T <= umbral) del tiempo en sistema de una cola M/M/s estable."""
+    carga = lambda_llegadas / mu
+    prob_espera = probabilidad_espera(num_cajas, carga)
+    holgura = num_cajas - 1 - carga
+
+    if abs(holgura) < 1e-12:
+        prob_excede = math.exp(-mu * umbral) * (1 + prob_espera * mu * umbral)
+    else:
+        prob_excede = math.exp(-mu * umbral) * (1 + prob_espera * (1 - math.exp(-mu * umbral * holgura)) / holgura)
+    return min(1.0, max(0.0, 1 - prob_excede))
+
+
+def metricas_erlang(config, num_cajas):
+    """Métricas analíticas con el mismo formato que una réplica simulada.
+
+    Si el sistema es estable (ρ < 1) se usan las fórmulas de Erlang C; el
+    servicio real no es exponencial, así que son una aproximación M/M/s con la
+    misma media de servicio. Si es inestable se usa la aproximación fluida del
+    horizonte finito: la cola crece a razón λ - sμ durante todo el período.
+    """
+    lambda_llegadas = config["lambda_llegadas"]
+    tiempo_simulacion = config["tiempo_simulacion"]
+    umbral = config["umbral_tiempo"]
+    mu = 1 / tiempo_servicio_medio(config)
+    carga = lambda_llegadas / mu
+    rho = carga / num_cajas
+    estable = rho < 1
+
+    if estable:
+        prob_espera = probabilidad_espera(num_cajas, carga)
+        tiempo_espera = prob_espera / (num_cajas * mu - lambda_llegadas)
+        porcentaje_sla = probabilidad_tiempo_sistema(num_cajas, lambda_llegadas, mu, umbral) * 100
+    else:
+        # Un cliente que llega en t espera (λ - sμ)·t / (sμ); en promedio sobre [0, T]
+        # la espera es la mitad de la del último cliente
+        prob_espera = 1.0
+        crecimiento = (lambda_llegadas - num_cajas * mu) / (num_cajas * mu)
+        tiempo_espera = crecimiento * tiempo_simulacion / 2
+        if crecimiento > 0:
+            instante_limite = max(0.0, umbral - 1 / mu) / crecimiento
+            porcentaje_sla = min(1.0, instante_limite / tiempo_simulacion) * 100
+        else:
+            porcentaje_sla = 100.0 if 1 / mu <= umbral else 0.0
+
+    return {
+        "num_clientes": lambda_llegadas * tiempo_simulacion,
+        "tiempo_sistema_prom": tiempo_espera + 1 / mu,
+        "tiempo_espera_prom": tiempo_espera,
+        "porcentaje_sla": porcentaje_sla,
+        "utilizacion": min(rho, 1.0) * 100,
+        "prob_espera": prob_espera,
+        "estable": estable,
+    }
+
+
+def evaluar_configuraciones(config):
+    """Evalúa analíticamente de 1 a config["max_cajas"] cajas, incluyendo costos."""
+    resultados = []
+    for s in range(1, config["max_cajas"] + 1):
+        metricas = metricas_erlang(config, s)
+        resultados.append({"num_cajas": s, "metricas": metricas, "costos": AnalizadorCostos.calcular_costos(metricas, s, config)})
+    return resultados
+
+
+def prefiltrar_cajas(config):
+    """Números de cajas que vale la pena simular según la aproximación analítica.
+
+    Para cada configuración se toma una cota inferior de su costo: el costo
+    fijo de cajas más, si es inestable, el costo de espera de la aproximación
+    fluida (la cola crece sin remedio). Se descartan las configuraciones cuya
+    cota supera en más de config["margen_prefiltro"] (50% por defecto) el mejor
+    costo total analítico, porque no pueden ser el óptimo.
+    """
+    evaluados = evaluar_configuraciones(config)
+    mejor_costo = min(r["costos"]["costo_total"] for r in evaluados)
+    limite = mejor_costo * (1 + config.get("margen_prefiltro", 0.5))
+
+    candidatos = []
+    for r in evaluados:
+        cota_inferior = r["costos"]["costo_cajas"]
+        if not r["metricas"]["estable"]:
+            cota_inferior += r["costos"]["costo_espera"]
+        if cota_inferior <= limite:
+            candidatos.append(r["num_cajas"])
+    return candidatos
@@ -2,6 +2,19 @@
 
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Cuantil 0.975 de la t de Student para 1 a 30 grados de libertad (IC 95% bilateral)
+CUANTILES_T_975 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+Z_975 = 1.959964
+
 class AnalizadorCostos:
     """Analiza costos y determina configuración óptima."""
 
@@ -46,3 +59,171 @@ class AnalizadorCostos:
         """Calcula la desviación estándar del costo total."""
         varianza = sum((c["costo_total"] - costo_promedio) ** 2 for c in costos_replicas) / len(costos_replicas)
         return math.sqrt(varianza)
+
+    @staticmethod
+    def cuantil_t(grados_libertad):
+        """Cuantil 0.975 de la t de Student (tabla hasta 30 grados de libertad).
+
+        Con más grados de libertad se usa la expansión de Cornish-Fisher
+        alrededor de z = 1.96, con error menor a 1e-4.
+        """
+        if grados_libertad <= len(CUANTILES_T_975):
+            return CUANTILES_T_975[grados_libertad - 1]
+        z, v = Z_975, grados_libertad
+        return (z + (z ** 3 + z) / (4 * v) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2)
+                + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3))
+
+    @staticmethod
+    def calcular_semiancho_ic(desv_est, n):
+        """Semiancho del intervalo de confianza 95% del costo promedio.
+
+        Usa el cuantil t de Student con n - 1 grados de libertad, así con pocas
+        réplicas el intervalo no queda angosto (t = 12.7 con n = 2, 2.26 con
+        n = 10). desv_est es la desviación poblacional de calcular_desviacion;
+        dividir por sqrt(n - 1) equivale a usar la desviación muestral sobre
+        sqrt(n).
+        """
+        if n < 2:
+            return math.inf
+        return AnalizadorCostos.cuantil_t(n - 1) * desv_est / math.sqrt(n - 1)
+
+    @staticmethod
+    def _diferencia_pareada(resumen, mejor):
+        """Media y varianza muestral de la diferencia de costo réplica a réplica contra la mejor.
+
+        La réplica k usa el mismo flujo aleatorio (y por lo tanto la misma
+        demanda) en todas las configuraciones (ver crear_generador), así que
+        se comparan en pares las primeras min(nᵢ, n_b) réplicas. Retorna
+        (media, varianza, pares).
+        """
+        pares = min(resumen["num_replicas"], mejor["num_replicas"])
+        diferencias = [a - b for a, b in zip(resumen["costos_replicas"][:pares], mejor["costos_replicas"][:pares])]
+        media = sum(diferencias) / pares
+        varianza = sum((d - media) ** 2 for d in diferencias) / (pares - 1)
+        return media, varianza, pares
+
+    @staticmethod
+    def probabilidad_seleccion_correcta(resumenes):
+        """Aproximación (cota de Bonferroni) de la probabilidad de selección correcta.
+
+        PCS ≈ 1 - Σ Φ(-δᵢ / eeᵢ) sobre las configuraciones distintas de la
+        mejor b, con δᵢ y eeᵢ la media y el error estándar de las diferencias
+        de costo réplica a réplica contra b (ver _diferencia_pareada), que
+        descuentan la correlación positiva entre configuraciones. Retorna None
+        si alguna configuración tiene menos de 2 réplicas.
+        """
+        if len(resumenes) < 2:
+            return 1.0
+        if any(r["num_replicas"] < 2 for r in resumenes):
+            return None
+
+        mejor = min(resumenes, key=lambda r: r["costos"]["costo_total"])
+        prob_error = 0.0
+        for r in resumenes:
+            if r is mejor:
+                continue
+            delta, varianza, pares = AnalizadorCostos._diferencia_pareada(r, mejor)
+            error_est = math.sqrt(varianza / pares)
+            if error_est == 0:
+                prob_error += 0.0 if delta > 0 else 0.5
+            else:
+                prob_error += 0.5 * math.erfc(delta / (error_est * math.sqrt(2)))
+        return max(0.0, 1 - prob_error)
+
+    @staticmethod
+    def asignar_ocba(resumenes, total_replicas):
+        """Reparte total_replicas entre las configuraciones según OCBA.
+
+        Las configuraciones no óptimas reciben réplicas proporcionales a
+        (sᵢ / δᵢ)², con sᵢ la desviación de la diferencia pareada contra la
+        mejor, así que las que compiten por el mínimo reciben más. La mejor
+        recibe tantas réplicas como su rival más exigente, que es lo que hace
+        falta para formar los pares. Nunca se asignan menos réplicas de las ya
+        simuladas.
+
+        Returns:
+            Diccionario {num_cajas: réplicas totales objetivo}.
+        """
+        mejor = min(resumenes, key=lambda r: r["costos"]["costo_total"])
+        pesos = {}
+        for r in resumenes:
+            if r is mejor:
+                continue
+            delta, varianza, _ = AnalizadorCostos._diferencia_pareada(r, mejor)
+            pesos[r["num_cajas"]] = varianza / max(delta, 1e-9) ** 2
+        pesos[mejor["num_cajas"]] = max(pesos.values(), default=0.0)
+
+        suma_pesos = sum(pesos.values())
+        if suma_pesos == 0:
+            return {r["num_cajas"]: r["num_replicas"] for r in resumenes}
+        return {
+            r["num_cajas"]: max(r["num_replicas"], round(total_replicas * pesos[r["num_cajas"]] / suma_pesos))
+            for r in resumenes
+        }
+
+    @staticmethod
+    def resumir_configuracion(resultados_replicas, num_cajas, config):
+        """Agrega métricas y costos de las réplicas de una configuración de cajas."""
+        n = len(resultados_replicas)
+        metricas_prom = AnalizadorCostos.agregar_resultados_replicas(resultados_replicas)
+
+        costos_replicas = [AnalizadorCostos.calcular_costos(r, num_cajas, config) for r in resultados_replicas]
+        costos_prom = {k: sum(c[k] for c in costos_replicas) / n for k in costos_replicas[0]}
+        desv_est = AnalizadorCostos.calcular_desviacion(costos_replicas, costos_prom["costo_total"])
+
+        return {
+            "num_cajas": num_cajas,
+            "metricas": metricas_prom,
+            "costos": costos_prom,
+            "desv_est": desv_est,
+            "semiancho_ic": AnalizadorCostos.calcular_semiancho_ic(desv_est, n),
+            "num_replicas": n,
+            "replicas": resultados_replicas,
+            "costos_replicas": [c["costo_total"] for c in costos_replicas],
+        }
+
+    @staticmethod
+    def evaluar_grilla_costos(resultados_por_cajas, config, costos_caja, costos_espera, costos_sla):
+        """Óptimo de cajas para cada combinación de una grilla de costos (requiere numpy).
+
+        El costo total es lineal en (costo_caja, costo_espera, costo_sla) con el
+        sla_objetivo fijo, así que las réplicas se reducen una sola vez a tres
+        promedios por configuración (cajas·tiempo, espera total e incumplimiento
+        de SLA) y la grilla completa se evalúa con broadcasting.
+
+        Returns:
+            Diccionario con los ejes "costos_caja", "costos_espera", "costos_sla",
+            "num_cajas" y los arreglos "costo_total" (caja × espera × sla × cajas),
+            "num_cajas_optimo" y "costo_optimo" (caja × espera × sla).
+        """
+        if np is None:
+            raise ImportError("La evaluación en grilla requiere la librería numpy (pip install numpy).")
+
+        num_cajas = np.array([r["num_cajas"] for r in resultados_por_cajas])
+        espera_total = np.empty(len(resultados_por_cajas))
+        incumplimiento = np.empty(len(resultados_por_cajas))
+        for i, r in enumerate(resultados_por_cajas):
+            replicas = r["replicas"]
+            espera_total[i] = np.mean([m["tiempo_espera_prom"] * m["num_clientes"] for m in replicas])
+            incumplimiento[i] = np.mean([max(0, config["sla_objetivo"] - m["porcentaje_sla"]) for m in replicas])
+        horas_caja = num_cajas * config["tiempo_simulacion"]
+
+        costos_caja = np.asarray(costos_caja, dtype=float)
+        costos_espera = np.asarray(costos_espera, dtype=float)
+        costos_sla = np.asarray(costos_sla, dtype=float)
+        costo_total = (
+            costos_caja[:, None, None, None] * horas_caja
+            + costos_espera[None, :, None, None] * espera_total
+            + costos_sla[None, None, :, None] * incumplimiento
+        )
+        indice_optimo = costo_total.argmin(axis=-1)
+
+        return {
+            "costos_caja": costos_caja,
+            "costos_espera": costos_espera,
+            "costos_sla": costos_sla,
+            "num_cajas": num_cajas,
+            "costo_total": costo_total,
+            "num_cajas_optimo": num_cajas[indice_optimo],
+            "costo_optimo": costo_total.min(axis=-1),
+        }
@@ -0,0 +1,457 @@
+"""Barrido headless sobre el número de cajas (sin dependencias de interfaz)."""
+
+import math
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+
+from analisis_erlang import prefiltrar_cajas, tiempo_servicio_medio
+from analizador_costos import AnalizadorCostos
+from simulador_colas import clave_replica, simular_replica_comun
+
+VARIACIONES_SENSIBILIDAD = [-20, -10, 0, 10, 20]
+# Parámetros que el simulador usa como enteros (rng.randint); al variarlos se redondean
+PARAMETROS_ENTEROS = ("articulos_min", "articulos_max")
+
+ESTRATEGIA_EXHAUSTIVA = "exhaustiva"
+ESTRATEGIA_LOCAL = "local"
+
+
+class SimulacionCancelada(Exception):
+    """Se lanza cuando el barrido se interrumpe a pedido del usuario."""
+
+
+def _verificar_cancelacion(cancelado):
+    if cancelado is not None and cancelado.is_set():
+        raise SimulacionCancelada()
+
+
+def _agrupar_lotes(config, tareas):
+    """Agrupa las tareas en lotes (lista_cajas, réplica) que se simulan juntos.
+
+    Con config["demanda_compartida"] cada réplica es un solo lote: su demanda
+    se genera una vez y se reutiliza para todos sus números de cajas. Sin esa
+    opción cada par (num_cajas, réplica) es un lote aparte que vuelve a
+    generar la misma demanda (el flujo solo depende de la réplica, ver
+    crear_generador), así que los resultados no cambian: solo el reparto del
+    trabajo.
+    """
+    if not config.get("demanda_compartida"):
+        return [([num_cajas], replica) for num_cajas, replica in tareas]
+
+    cajas_por_replica = {}
+    for num_cajas, replica in tareas:
+        cajas_por_replica.setdefault(replica, []).append(num_cajas)
+    return [(lista_cajas, replica) for replica, lista_cajas in cajas_por_replica.items()]
+
+
+def cajas_a_evaluar(config):
+    """Números de cajas que recorre el barrido.
+
+    Por defecto se evalúa de 1 a config["max_cajas"]; con
+    config["prefiltro_erlang"] solo se simulan las configuraciones que la
+    aproximación analítica no descarta.
+    """
+    if config.get("prefiltro_erlang"):
+        return prefiltrar_cajas(config)
+    return list(range(1, config["max_cajas"] + 1))
+
+
+def ejecutar_tareas(config, tareas, num_workers=1, progreso=None, cancelado=None, al_completar=None, cache=None, executor=None):
+    """Simula cada par (num_cajas, réplica) de la lista de tareas.
+
+    Args:
+        config: Configuración de la simulación.
+        tareas: Lista de tuplas (num_cajas, replica).
+        num_workers: Procesos a usar; con 1 se ejecuta en el proceso actual.
+        progreso: Callback opcional progreso(completadas, total, num_cajas).
+        cancelado: threading.Event opcional; si se activa se lanza SimulacionCancelada.
+        al_completar: Callback opcional al_completar((num_cajas, replica), metricas).
+        cache: Diccionario opcional {clave_replica: métricas}; las réplicas que
+            ya estén se reutilizan y las nuevas se guardan. No se usa si
+            config["conservar_clientes"] está activo.
+        executor: ProcessPoolExecutor compartido opcional; si se indica se usa
+            en lugar de crear uno propio (y no se cierra al terminar).
+
+    Returns:
+        Diccionario {(num_cajas, replica): métricas de la réplica}.
+    """
+    total = len(tareas)
+    resultados = {}
+    usar_cache = cache is not None and not config.get("conservar_clientes", True)
+
+    def registrar(replica, metricas_por_cajas):
+        for num_cajas, metricas in metricas_por_cajas.items():
+            resultados[(num_cajas, replica)] = metricas
+            if usar_cache:
+                cache[clave_replica(config, num_cajas, replica)] = metricas
+            if al_completar:
+                al_completar((num_cajas, replica), metricas)
+            if progreso:
+                progreso(len(resultados), total, num_cajas)
+
+    if usar_cache:
+        faltantes = []
+        for num_cajas, replica in tareas:
+            metricas = cache.get(clave_replica(config, num_cajas, replica))
+            if metricas is None:
+                faltantes.append((num_cajas, replica))
+            else:
+                registrar(replica, {num_cajas: metricas})
+        tareas = faltantes
+    lotes = _agrupar_lotes(config, tareas)
+
+    if executor is None and (num_workers <= 1 or len(lotes) <= 1):
+        for lista_cajas, replica in lotes:
+            _verificar_cancelacion(cancelado)
+            registrar(replica, simular_replica_comun(config, lista_cajas, replica))
+        return resultados
+
+    propio = executor is None
+    with ProcessPoolExecutor(max_workers=min(num_workers, len(lotes))) if propio else nullcontext(executor) as executor:
+        futuros = {
+            executor.submit(simular_replica_comun, config, lista_cajas, replica): replica
+            for lista_cajas, replica in lotes
+        }
+        pendientes = set(futuros)
+        while pendientes:
+            if cancelado is not None and cancelado.is_set():
+                # Descarta lo que no empezó; solo se esperan las réplicas en curso
+                if propio:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                else:
+                    for futuro in pendientes:
+                        futuro.cancel()
+                raise SimulacionCancelada()
+            listos, pendientes = wait(pendientes, timeout=0.1, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                registrar(futuros[futuro], futuro.result())
+
+    return resultados
+
+
+def _replicas_objetivo(resumen, config):
+    """Total de réplicas que necesita una configuración en modo adaptativo.
+
+    Retorna las réplicas ya simuladas si el semiancho del IC 95% del costo
+    total está bajo config["semiancho_objetivo"] o si se alcanzó el tope
+    config["max_replicas"]; si no, estima cuántas hacen falta con la
+    desviación observada (n ≈ (1.96·σ / objetivo)²) y suma al menos una. El
+    semiancho usa el cuantil t (ver AnalizadorCostos.calcular_semiancho_ic),
+    así que con pocas réplicas la estimación asintótica puede quedarse corta
+    y se agrega otra ronda; estimar con el t de n muy chico pediría de más.
+    """
+    n = resumen["num_replicas"]
+    objetivo = config["semiancho_objetivo"]
+    tope = config.get("max_replicas", 200)
+    if resumen["semiancho_ic"] <= objetivo or n >= tope:
+        return n
+    estimado = math.ceil((1.96 * resumen["desv_est"] / objetivo) ** 2) + 1
+    return min(tope, max(n + 1, estimado))
+
+
+def _busqueda_local(config, lista_cajas, evaluar):
+    """Recorre lista_cajas desde la carga de Erlang hacia ambos lados.
+
+    Empieza en el primer número de cajas estable (⌊λ/μ⌋ + 1, o el más
+    cercano de la lista) y avanza hacia arriba y hacia abajo a la vez: en
+    cada ronda el siguiente candidato de cada sentido se simula en un mismo
+    lote, así comparten el pool y, con demanda compartida, la demanda generada
+    de cada réplica. Cada sentido se detiene tras config["paciencia"] pasos
+    seguidos sin mejorar el mejor costo visto. Supone una curva de costo
+    unimodal.
+
+    Args:
+        config: Configuración de la simulación.
+        lista_cajas: Números de cajas candidatos, en orden creciente.
+        evaluar: Función evaluar(lista) que simula esos números de cajas y
+            retorna {num_cajas: resumen}.
+    """
+    paciencia = config.get("paciencia", 2)
+    carga = config["lambda_llegadas"] * tiempo_servicio_medio(config)
+    inicio = min(range(len(lista_cajas)), key=lambda i: abs(lista_cajas[i] - (math.floor(carga) + 1)))
+    siguiente = {1: inicio + 1, -1: inicio - 1}
+    sin_mejora = {1: 0, -1: 0}
+    mejor_costo = None
+
+    while True:
+        activos = [paso for paso in (1, -1) if 0 <= siguiente[paso] < len(lista_cajas) and sin_mejora[paso] < paciencia]
+        lote = [lista_cajas[siguiente[paso]] for paso in activos]
+        if mejor_costo is None:
+            lote.insert(0, lista_cajas[inicio])
+        if not lote:
+            break
+        resumenes = evaluar(lote)
+        if mejor_costo is None:
+            mejor_costo = resumenes[lista_cajas[inicio]]["costos"]["costo_total"]
+
+        for paso in activos:
+            costo = resumenes[lista_cajas[siguiente[paso]]]["costos"]["costo_total"]
+            if costo < mejor_costo:
+                mejor_costo = costo
+                sin_mejora[paso] = 0
+            else:
+                sin_mejora[paso] += 1
+            siguiente[paso] += paso
+
+
+def _seleccion_ocba(config, resumenes, ampliar):
+    """Asigna réplicas extra por rondas con OCBA hasta agotar el presupuesto.
+
+    En cada ronda se suman config["incremento_ocba"] réplicas (20 por
+    defecto) al total y se reparten con AnalizadorCostos.asignar_ocba; se
+    detiene al gastar config["presupuesto_ocba"] réplicas extra o cuando la
+    probabilidad de selección correcta alcanza config["pcs_objetivo"].
+
+    Args:
+        config: Configuración de la simulación.
+        resumenes: Diccionario {num_cajas: resumen}; ampliar lo actualiza.
+        ampliar: Función ampliar({num_cajas: réplicas totales}) que simula
+            las réplicas faltantes.
+    """
+    presupuesto = config.get("presupuesto_ocba", 200)
+    incremento = config.get("incremento_ocba", 20)
+    pcs_objetivo = config.get("pcs_objetivo", 0.95)
+    gastadas = 0
+
+    while gastadas < presupuesto:
+        pcs = AnalizadorCostos.probabilidad_seleccion_correcta(list(resumenes.values()))
+        if pcs is not None and pcs >= pcs_objetivo:
+            break
+        actuales = {s: r["num_replicas"] for s, r in resumenes.items()}
+        ronda = min(incremento, presupuesto - gastadas)
+        asignacion = AnalizadorCostos.asignar_ocba(list(resumenes.values()), sum(actuales.values()) + ronda)
+        deficit = {s: asignacion[s] - actuales[s] for s in asignacion if asignacion[s] > actuales[s]}
+        if not deficit:
+            break
+
+        # asignar_ocba nunca quita réplicas, así que el déficit puede superar la ronda: se escala
+        escala = min(1.0, ronda / sum(deficit.values()))
+        extra = {s: int(d * escala) for s, d in deficit.items()}
+        if not any(extra.values()):
+            s_max = max(deficit, key=deficit.get)
+            extra[s_max] = min(deficit[s_max], ronda)
+        ampliar({s: actuales[s] + e for s, e in extra.items() if e})
+        gastadas += sum(extra.values())
+
+
+def ejecutar_barrido(config, progreso=None, cancelado=None, parcial=None, cache=None, executor=None):
+    """Evalúa los números de cajas de cajas_a_evaluar y selecciona el óptimo por costo total.
+
+    Todas las combinaciones (num_cajas, réplica) se reparten entre
+    config["num_workers"] procesos y se agregan con AnalizadorCostos.
+    Si se indica, parcial(resumen) recibe cada configuración apenas terminan
+    todas sus réplicas.
+
+    Con config["replicas_adaptativas"] se simulan primero config["num_replicas"]
+    réplicas por configuración y luego se agregan rondas solo a las que aún no
+    alcanzan el semiancho objetivo (ver _replicas_objetivo). La réplica k usa
+    la misma demanda en todas las configuraciones (ver crear_generador).
+
+    config["estrategia_busqueda"] elige entre ESTRATEGIA_EXHAUSTIVA (por
+    defecto, simula todas) y ESTRATEGIA_LOCAL (ver _busqueda_local), que solo
+    simula las configuraciones cercanas al óptimo.
+
+    cache se pasa a ejecutar_tareas. Si no se indica executor y
+    config["num_workers"] > 1 se crea un solo pool de procesos que usan
+    todas las rondas (réplicas adaptativas, lotes de la búsqueda local y
+    rondas OCBA) y se cierra al terminar.
+
+    Con config["seleccion_ocba"], al final se reparten réplicas extra entre
+    las configuraciones que compiten por el mínimo (ver _seleccion_ocba).
+
+    Returns:
+        Diccionario {"por_cajas": [...], "optimo": {...}, "pcs": ...} con el
+        mismo formato que usa la interfaz; en búsqueda local "por_cajas" solo
+        trae las configuraciones simuladas. "pcs" es la probabilidad
+        aproximada de haber elegido el óptimo correcto (None con 1 réplica),
+        calculada sobre las diferencias pareadas réplica a réplica.
+    """
+    num_workers = config.get("num_workers", 1)
+    if executor is not None or num_workers <= 1:
+        return _barrido(config, progreso, cancelado, parcial, cache, executor)
+
+    pool = ProcessPoolExecutor(max_workers=num_workers)
+    try:
+        return _barrido(config, progreso, cancelado, parcial, cache, pool)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _barrido(config, progreso, cancelado, parcial, cache, executor):
+    """Cuerpo de ejecutar_barrido; executor es el pool compartido por todas las rondas (None en serie)."""
+    lista_cajas = cajas_a_evaluar(config)
+    adaptativo = config.get("replicas_adaptativas", False)
+    if adaptativo and config["semiancho_objetivo"] <= 0:
+        raise ValueError("El semiancho objetivo del IC debe ser mayor que cero")
+    if config.get("seleccion_ocba") and config["num_replicas"] < 2:
+        raise ValueError("La selección OCBA necesita al menos 2 réplicas iniciales por configuración")
+    estrategia = config.get("estrategia_busqueda", ESTRATEGIA_EXHAUSTIVA)
+    if estrategia not in (ESTRATEGIA_EXHAUSTIVA, ESTRATEGIA_LOCAL):
+        raise ValueError(f"Estrategia de búsqueda desconocida: {estrategia}")
+    replicas_por_cajas = {s: {} for s in lista_cajas}
+    objetivo = {s: config["num_replicas"] for s in lista_cajas}
+    resumenes = {}
+    completadas_previas = 0
+
+    def al_completar(clave, metricas):
+        s, replica = clave
+        replicas_por_cajas[s][replica] = metricas
+        if parcial and not adaptativo and len(replicas_por_cajas[s]) == objetivo[s]:
+            parcial(resumir(s))
+
+    def resumir(s):
+        resultados_replicas = [replicas_por_cajas[s][replica] for replica in range(objetivo[s])]
+        return AnalizadorCostos.resumir_configuracion(resultados_replicas, s, config)
+
+    def completar(cajas):
+        """Simula las réplicas que faltan para llegar a objetivo[s] en cada s."""
+        nonlocal completadas_previas
+        tareas = [(s, replica) for s in cajas for replica in range(len(replicas_por_cajas[s]), objetivo[s])]
+        progreso_ronda = None
+        if progreso:
+            base = completadas_previas
+            progreso_ronda = lambda completadas, total, num_cajas, base=base: progreso(base + completadas, base + total, num_cajas)
+        ejecutar_tareas(config, tareas, config.get("num_workers", 1), progreso_ronda, cancelado, al_completar, cache, executor)
+        completadas_previas += len(tareas)
+
+    def evaluar(nuevas_cajas):
+        pendientes = list(nuevas_cajas)
+        while pendientes:
+            completar(pendientes)
+
+            if not adaptativo:
+                break
+            siguientes = []
+            for s in pendientes:
+                resumen = resumir(s)
+                objetivo[s] = _replicas_objetivo(resumen, config)
+                if objetivo[s] > resumen["num_replicas"]:
+                    siguientes.append(s)
+                elif parcial:
+                    parcial(resumen)
+            pendientes = siguientes
+
+        for s in nuevas_cajas:
+            resumenes[s] = resumir(s)
+
+    if estrategia == ESTRATEGIA_LOCAL:
+        def evaluar_lote(cajas):
+            evaluar(cajas)
+            return {s: resumenes[s] for s in cajas}
+
+        _busqueda_local(config, lista_cajas, evaluar_lote)
+    else:
+        evaluar(lista_cajas)
+
+    if config.get("seleccion_ocba"):
+        def ampliar(asignacion):
+            objetivo.update(asignacion)
+            completar(list(asignacion))
+            for s in asignacion:
+                resumenes[s] = resumir(s)
+
+        _seleccion_ocba(config, resumenes, ampliar)
+
+    resultados_por_cajas = [resumenes[s] for s in lista_cajas if s in resumenes]
+
+    return {
+        "por_cajas": resultados_por_cajas,
+        "optimo": min(resultados_por_cajas, key=lambda x: x["costos"]["costo_total"]),
+        "pcs": AnalizadorCostos.probabilidad_seleccion_correcta(resultados_por_cajas),
+    }
+
+
+def recalcular_costos(resultados, config):
+    """Re-cotiza un barrido con otros parámetros de costo sin volver a simular.
+
+    Toma las métricas por réplica guardadas en resultados["por_cajas"][*]["replicas"]
+    y recalcula costos, desviaciones, óptimo y PCS con los costos de config
+    (costo_caja, costo_espera, costo_sla, sla_objetivo). Solo se re-cotizan
+    las configuraciones que se simularon.
+
+    Returns:
+        Diccionario con el mismo formato que ejecutar_barrido.
+    """
+    resultados_por_cajas = [
+        AnalizadorCostos.resumir_configuracion(r["replicas"], r["num_cajas"], config)
+        for r in resultados["por_cajas"]
+    ]
+    return {
+        "por_cajas": resultados_por_cajas,
+        "optimo": min(resultados_por_cajas, key=lambda x: x["costos"]["costo_total"]),
+        "pcs": AnalizadorCostos.probabilidad_seleccion_correcta(resultados_por_cajas),
+    }
+
+
+def ejecutar_sensibilidad(config, variaciones=VARIACIONES_SENSIBILIDAD, num_replicas=10, progreso=None, cancelado=None, parametro="lambda_llegadas", cache=None):
+    """Repite el barrido variando un parámetro en los porcentajes indicados.
+
+    Cualquier clave numérica de la configuración sirve como parámetro (λ,
+    tiempo de escaneo, costo por caja, ...). Los de PARAMETROS_ENTEROS
+    (articulos_min, articulos_max) se redondean para seguir siendo enteros;
+    el resto se varía como float aunque su valor base sea entero. Las claves
+    inexistentes o no numéricas (incluidos los interruptores booleanos)
+    lanzan ValueError. Las variaciones se ejecutan a la vez, cada una en un
+    hilo, y con config["num_workers"] > 1 comparten un solo
+    pool de procesos. Con cache (ver ejecutar_tareas) se reutilizan las
+    réplicas ya simuladas, por ejemplo la variación 0% del barrido principal
+    o todas las réplicas si solo cambia un costo.
+
+    num_replicas reemplaza a config["num_replicas"]; con
+    config["replicas_adaptativas"] es la cantidad inicial por configuración.
+
+    Returns:
+        Lista con {"variacion", "parametro", "valor", "lambda", "resultados",
+        "optimo"} por variación, donde "resultados" trae el costo total
+        promedio para cada número de cajas.
+    """
+    valor_base = config.get(parametro)
+    if isinstance(valor_base, bool) or not isinstance(valor_base, (int, float)):
+        raise ValueError(f"El parámetro de sensibilidad '{parametro}' debe ser una clave numérica de la configuración")
+
+    configs_var = []
+    for var in variaciones:
+        config_temp = config.copy()
+        valor = valor_base * (1 + var / 100)
+        config_temp[parametro] = round(valor) if parametro in PARAMETROS_ENTEROS else valor
+        config_temp["num_replicas"] = num_replicas
+        configs_var.append(config_temp)
+
+    # El total de cada variación se estima al inicio y se corrige cuando reporta avance
+    completadas_por_var = [0] * len(configs_var)
+    totales_por_var = [len(cajas_a_evaluar(c)) * num_replicas for c in configs_var]
+    candado = threading.Lock()
+
+    def progreso_variacion(indice):
+        def reportar(completadas, total, num_cajas):
+            with candado:
+                completadas_por_var[indice] = completadas
+                totales_por_var[indice] = total
+                progreso(sum(completadas_por_var), sum(totales_por_var), num_cajas)
+        return reportar if progreso else None
+
+    num_workers = config.get("num_workers", 1)
+    pool = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else None
+    try:
+        # Sin pool las variaciones se simulan una tras otra: en hilos solo competirían por el GIL
+        with ThreadPoolExecutor(max_workers=len(configs_var) if pool else 1) as hilos:
+            futuros = [
+                hilos.submit(ejecutar_barrido, config_temp, progreso_variacion(indice), cancelado, None, cache, pool)
+                for indice, config_temp in enumerate(configs_var)
+            ]
+            barridos = [futuro.result() for futuro in futuros]
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    resultados_sensibilidad = []
+    for var, config_temp, barrido in zip(variaciones, configs_var, barridos):
+        resultados_var = [{"num_cajas": r["num_cajas"], "costo_total": r["costos"]["costo_total"], "num_replicas": r["num_replicas"]} for r in barrido["por_cajas"]]
+        optimo_var = min(resultados_var, key=lambda x: x["costo_total"])
+        resultados_sensibilidad.append({
+            "variacion": var, "parametro": parametro, "valor": config_temp[parametro],
+            "lambda": config_temp["lambda_llegadas"], "resultados": resultados_var, "optimo": optimo_var,
+        })
+
+    return resultados_sensibilidad
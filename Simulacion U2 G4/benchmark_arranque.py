@@ -0,0 +1,59 @@
+"""Benchmark de arranque de la interfaz: tiempo hasta la primera ventana."""
+
+import os
+import subprocess
+import sys
+import time
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+
+# Se ejecuta en un proceso nuevo para medir el arranque en frío (sin módulos ya cargados)
+CODIGO_VENTANA = """
+import sys, time
+inicio = time.perf_counter()
+import interfaz_simulacion
+importado = time.perf_counter()
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print(importado - inicio, "nan", "matplotlib" in sys.modules)
+    sys.exit()
+interfaz_simulacion.InterfazSimulacion(root)
+root.update()
+print(importado - inicio, time.perf_counter() - inicio, "matplotlib" in sys.modules)
+root.destroy()
+"""
+
+
+def medir_arranque():
+    """Retorna (importación, primera ventana, proceso total, matplotlib cargado).
+
+    Importación y primera ventana las mide el proceso hijo desde su primera
+    línea; el proceso total incluye además el arranque del intérprete y el
+    cierre. Sin pantalla la primera ventana es nan.
+    """
+    inicio = time.perf_counter()
+    salida = subprocess.run([sys.executable, "-c", CODIGO_VENTANA], cwd=CARPETA, capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - inicio
+    importacion, ventana, matplotlib_cargado = salida.split()
+    return float(importacion), float(ventana), total, matplotlib_cargado == "True"
+
+
+def main(corridas=5):
+    print(f"{'Corrida':>7} │ {'Importación (s)':>15} │ {'Primera ventana (s)':>19} │ {'Proceso total (s)':>17} │ matplotlib cargado")
+    print("─" * 88)
+    mediciones = []
+    for corrida in range(1, corridas + 1):
+        importacion, primera_ventana, total, matplotlib_cargado = medir_arranque()
+        mediciones.append((importacion, primera_ventana, total))
+        print(f"{corrida:>7} │ {importacion:>15.3f} │ {primera_ventana:>19.3f} │ {total:>17.3f} │ {'sí' if matplotlib_cargado else 'no'}")
+
+    print("─" * 88)
+    print(f"{'Mejor':>7} │ {min(m[0] for m in mediciones):>15.3f} │ {min(m[1] for m in mediciones):>19.3f} │ {min(m[2] for m in mediciones):>17.3f} │")
+    if any(m[1] != m[1] for m in mediciones):
+        print("No hay pantalla disponible: solo se midió la importación del módulo.")
+
+
+if __name__ == "__main__":
+    main()
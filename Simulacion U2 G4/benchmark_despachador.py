@@ -0,0 +1,66 @@
+"""Benchmark del despachador de cajas: costo por llegada vs número de cajas."""
+
+import random
+import time
+
+from simulador_colas import despachar_fifo
+
+
+def despachar_lineal(llegadas, servicios, num_cajas):
+    """Despachador original: busca la caja libre con min() en O(s) por llegada."""
+    cajas = [0.0] * num_cajas
+    inicios = []
+
+    for tiempo_llegada, tiempo_servicio in zip(llegadas, servicios):
+        caja_disponible = min(range(num_cajas), key=lambda i: cajas[i])
+        inicio = max(tiempo_llegada, cajas[caja_disponible])
+        cajas[caja_disponible] = inicio + tiempo_servicio
+        inicios.append(inicio)
+
+    return inicios
+
+
+def generar_carga(num_llegadas, num_cajas, utilizacion=0.9):
+    """Genera llegadas y servicios con la utilización indicada para s cajas."""
+    rng = random.Random(2024)
+    servicio_medio = 1.0
+    lambda_llegadas = utilizacion * num_cajas / servicio_medio
+
+    llegadas = []
+    tiempo = 0.0
+    for _ in range(num_llegadas):
+        tiempo += rng.expovariate(lambda_llegadas)
+        llegadas.append(tiempo)
+    servicios = [rng.expovariate(1 / servicio_medio) for _ in range(num_llegadas)]
+    return llegadas, servicios
+
+
+def medir(despachador, llegadas, servicios, num_cajas, repeticiones=3):
+    """Retorna el mejor tiempo por llegada (microsegundos)."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        despachador(llegadas, servicios, num_cajas)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / len(llegadas) * 1e6
+
+
+def main():
+    num_llegadas = 50_000
+    print(f"Llegadas por corrida: {num_llegadas}")
+    print(f"{'Cajas':>6} │ {'Lineal (µs/lleg.)':>18} │ {'Heap (µs/lleg.)':>16} │ {'Aceleración':>11}")
+    print("─" * 62)
+
+    for num_cajas in (1, 2, 5, 10, 20, 50, 100, 200):
+        llegadas, servicios = generar_carga(num_llegadas, num_cajas)
+
+        # Ambos despachadores deben asignar exactamente los mismos inicios
+        assert despachar_lineal(llegadas, servicios, num_cajas) == despachar_fifo(llegadas, servicios, num_cajas)
+
+        t_lineal = medir(despachar_lineal, llegadas, servicios, num_cajas)
+        t_heap = medir(despachar_fifo, llegadas, servicios, num_cajas)
+        print(f"{num_cajas:>6} │ {t_lineal:>18.3f} │ {t_heap:>16.3f} │ {t_lineal / t_heap:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
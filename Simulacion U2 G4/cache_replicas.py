@@ -0,0 +1,132 @@
+"""Caché persistente de réplicas simuladas (SQLite, direccionada por contenido)."""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Subir este número cuando el simulador cambie los resultados de una réplica:
+# invalida todas las entradas guardadas con el formato anterior
+VERSION_FORMATO = 1
+
+RUTA_POR_DEFECTO = os.path.join(os.path.expanduser("~"), ".cache", "simulacion_cajas", "replicas.sqlite3")
+TAMANO_MAXIMO_POR_DEFECTO = 64 * 1024 * 1024
+
+
+def digerir_clave(clave):
+    """Hash SHA-256 de una clave de réplica (ver simulador_colas.clave_replica).
+
+    Los números se normalizan a float para que 5 y 5.0 den el mismo hash.
+    """
+    normalizada = [float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v for v in clave]
+    texto = json.dumps([VERSION_FORMATO, *normalizada])
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheReplicas:
+    """Guarda en disco las métricas de cada réplica, con expulsión LRU por tamaño.
+
+    Se usa como el diccionario de caché de barrido.ejecutar_tareas: cada
+    entrada es {clave_replica: métricas}. Como la clave solo incluye los
+    campos de simulación, cambiar un costo reutiliza todas las réplicas y
+    los costos se recalculan sin volver a simular.
+
+    Las escrituras se confirman en lotes (cada `lote` entradas o cada 2
+    segundos) y al llamar a guardar(); al confirmar se expulsan las entradas
+    usadas hace más tiempo hasta quedar bajo tamano_maximo bytes.
+    """
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO, tamano_maximo=TAMANO_MAXIMO_POR_DEFECTO, lote=500):
+        if ruta != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self.tamano_maximo = tamano_maximo
+        self.lote = lote
+        self.candado = threading.Lock()
+        self.pendientes = 0
+        self.ultimo_guardado = time.monotonic()
+
+        # Los hilos de la sensibilidad comparten la conexión; el candado serializa el acceso
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS replicas ("
+            "clave TEXT PRIMARY KEY, metricas TEXT NOT NULL, tamano INTEGER NOT NULL, ultimo_uso REAL NOT NULL)"
+        )
+        self.conexion.execute("CREATE INDEX IF NOT EXISTS idx_ultimo_uso ON replicas (ultimo_uso)")
+        self.conexion.commit()
+        atexit.register(self.cerrar)
+
+    def get(self, clave, defecto=None):
+        """Métricas guardadas para la clave (y marca la entrada como usada)."""
+        digesto = digerir_clave(clave)
+        with self.candado:
+            fila = self.conexion.execute("SELECT metricas FROM replicas WHERE clave = ?", (digesto,)).fetchone()
+            if fila is None:
+                return defecto
+            self.conexion.execute("UPDATE replicas SET ultimo_uso = ? WHERE clave = ?", (time.time(), digesto))
+            self._registrar_cambio()
+        return json.loads(fila[0])
+
+    def __contains__(self, clave):
+        with self.candado:
+            return self.conexion.execute("SELECT 1 FROM replicas WHERE clave = ?", (digerir_clave(clave),)).fetchone() is not None
+
+    def __setitem__(self, clave, metricas):
+        texto = json.dumps(metricas)
+        with self.candado:
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO replicas (clave, metricas, tamano, ultimo_uso) VALUES (?, ?, ?, ?)",
+                (digerir_clave(clave), texto, len(texto), time.time()),
+            )
+            self._registrar_cambio()
+
+    def __len__(self):
+        with self.candado:
+            return self.conexion.execute("SELECT COUNT(*) FROM replicas").fetchone()[0]
+
+    def _registrar_cambio(self):
+        self.pendientes += 1
+        if self.pendientes >= self.lote or time.monotonic() - self.ultimo_guardado > 2:
+            self._confirmar()
+
+    def _confirmar(self):
+        """Expulsa por LRU lo que exceda el tamaño máximo y confirma la transacción."""
+        total = self.conexion.execute("SELECT COALESCE(SUM(tamano), 0) FROM replicas").fetchone()[0]
+        if total > self.tamano_maximo:
+            exceso = total - self.tamano_maximo
+            expulsar = []
+            for clave, tamano in self.conexion.execute("SELECT clave, tamano FROM replicas ORDER BY ultimo_uso"):
+                if exceso <= 0:
+                    break
+                expulsar.append((clave,))
+                exceso -= tamano
+            self.conexion.executemany("DELETE FROM replicas WHERE clave = ?", expulsar)
+        self.conexion.commit()
+        self.pendientes = 0
+        self.ultimo_guardado = time.monotonic()
+
+    def guardar(self):
+        """Confirma en disco las entradas pendientes."""
+        with self.candado:
+            if self.conexion is not None:
+                self._confirmar()
+
+    def vaciar(self):
+        """Elimina todas las entradas guardadas."""
+        with self.candado:
+            self.conexion.execute("DELETE FROM replicas")
+            self.conexion.commit()
+            self.pendientes = 0
+
+    def cerrar(self):
+        """Guarda lo pendiente y cierra la base de datos."""
+        with self.candado:
+            if self.conexion is None:
+                return
+            self._confirmar()
+            self.conexion.close()
+            self.conexion = None
@@ -0,0 +1,147 @@
+"""Ejecución del barrido sin interfaz gráfica (servidores sin pantalla).
+
+Uso:
+    python cli.py config.json --workers 4 --replicas 50 --motor numpy -o resultados.csv
+
+Solo importa el núcleo de simulación; pandas se carga únicamente si se pide
+salida Parquet, y tkinter, matplotlib o reportlab nunca se importan.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+from barrido import SimulacionCancelada, ejecutar_barrido
+from simulador_colas import MOTOR_NUMPY, MOTOR_PYTHON
+
+# Valores por defecto de la pantalla de configuración de la interfaz
+CONFIG_POR_DEFECTO = {
+    "t_scan_normal": 5, "t_cobro_min": 15, "t_cobro_max": 30,
+    "articulos_min": 1, "articulos_max": 50,
+    "costo_caja": 0.5, "costo_espera": 0.2, "costo_sla": 100,
+    "sla_objetivo": 80, "umbral_tiempo": 8,
+    "num_replicas": 20, "tiempo_simulacion": 60, "lambda_llegadas": 5, "max_cajas": 10,
+    "num_workers": 1, "semilla": 0,
+    "conservar_clientes": False, "demanda_compartida": True,
+}
+
+FORMATOS = ("json", "csv", "parquet")
+
+
+def cargar_config(ruta):
+    """Lee la configuración desde un archivo JSON (o TOML con Python 3.11+)."""
+    if ruta.endswith(".toml"):
+        import tomllib
+        with open(ruta, "rb") as archivo:
+            return tomllib.load(archivo)
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+def filas_resultados(resultados):
+    """Aplana el resumen de cada configuración en una fila (sin las réplicas)."""
+    filas = []
+    for r in resultados["por_cajas"]:
+        fila = {"num_cajas": r["num_cajas"], "optimo": r["num_cajas"] == resultados["optimo"]["num_cajas"]}
+        fila.update(r["costos"])
+        fila.update(r["metricas"])
+        fila.update({"desv_est": r["desv_est"], "semiancho_ic": r["semiancho_ic"], "num_replicas": r["num_replicas"]})
+        filas.append(fila)
+    return filas
+
+
+def escribir_resultados(config, resultados, salida, formato, incluir_replicas=False):
+    """Escribe los resultados en salida ("-" = salida estándar) con el formato indicado."""
+    filas = filas_resultados(resultados)
+
+    if formato == "parquet":
+        try:
+            import pandas as pd
+        except ImportError:
+            raise SystemExit("La salida Parquet requiere pandas y pyarrow (pip install pandas pyarrow).")
+        pd.DataFrame(filas).to_parquet(salida, index=False)
+        return
+
+    archivo = sys.stdout if salida == "-" else open(salida, "w", encoding="utf-8", newline="")
+    try:
+        if formato == "csv":
+            escritor = csv.DictWriter(archivo, fieldnames=list(filas[0]))
+            escritor.writeheader()
+            escritor.writerows(filas)
+        else:
+            documento = {"config": config, "pcs": resultados["pcs"], "optimo": next(f for f in filas if f["optimo"]), "por_cajas": filas}
+            if incluir_replicas:
+                documento["replicas"] = {str(r["num_cajas"]): r["replicas"] for r in resultados["por_cajas"]}
+            json.dump(documento, archivo, ensure_ascii=False, indent=2)
+            archivo.write("\n")
+    finally:
+        if archivo is not sys.stdout:
+            archivo.close()
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Barrido de número de cajas sin interfaz gráfica.")
+    parser.add_argument("config", nargs="?", help="Archivo de configuración JSON/TOML (mismas claves que la interfaz); las faltantes toman el valor por defecto")
+    parser.add_argument("-o", "--salida", default="-", help="Archivo de salida (por defecto, JSON a la salida estándar)")
+    parser.add_argument("-f", "--formato", choices=FORMATOS, help="Formato de salida; por defecto se deduce de la extensión")
+    parser.add_argument("-w", "--workers", type=int, help="Procesos en paralelo (num_workers)")
+    parser.add_argument("-r", "--replicas", type=int, help="Réplicas por configuración (num_replicas)")
+    parser.add_argument("-m", "--motor", choices=(MOTOR_PYTHON, MOTOR_NUMPY), help="Motor de simulación")
+    parser.add_argument("-s", "--semilla", type=int, help="Semilla base")
+    parser.add_argument("--max-cajas", type=int, help="Máximo de cajas a probar")
+    parser.add_argument("--cache", help="Archivo SQLite de caché de réplicas (ver cache_replicas.py)")
+    parser.add_argument("--incluir-replicas", action="store_true", help="En JSON, agrega las métricas de cada réplica")
+    parser.add_argument("-q", "--silencioso", action="store_true", help="No mostrar progreso ni resumen en stderr")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    config = dict(CONFIG_POR_DEFECTO)
+    if args.config:
+        config.update(cargar_config(args.config))
+    for clave, valor in (("num_workers", args.workers), ("num_replicas", args.replicas), ("motor", args.motor),
+                         ("semilla", args.semilla), ("max_cajas", args.max_cajas)):
+        if valor is not None:
+            config[clave] = valor
+
+    formato = args.formato
+    if formato is None:
+        extension = os.path.splitext(args.salida)[1].lstrip(".").lower()
+        formato = extension if extension in FORMATOS else "json"
+    if formato == "parquet" and args.salida == "-":
+        raise SystemExit("La salida Parquet necesita un archivo (-o resultados.parquet).")
+
+    cache = None
+    if args.cache:
+        from cache_replicas import CacheReplicas
+        cache = CacheReplicas(args.cache)
+
+    def progreso(completadas, total, num_cajas):
+        print(f"\rSimulando réplicas... ({completadas}/{total}) · última: {num_cajas} caja(s)", end="", file=sys.stderr, flush=True)
+
+    # La barra de progreso solo tiene sentido en una terminal (no en logs redirigidos)
+    mostrar_progreso = not args.silencioso and sys.stderr.isatty()
+    try:
+        resultados = ejecutar_barrido(config, progreso=progreso if mostrar_progreso else None, cache=cache)
+    except (KeyboardInterrupt, SimulacionCancelada):
+        print("\nSimulación interrumpida.", file=sys.stderr)
+        return 130
+    finally:
+        if cache is not None:
+            cache.cerrar()
+    if mostrar_progreso:
+        print(file=sys.stderr)
+    if not args.silencioso:
+        optimo = resultados["optimo"]
+        print(f"Óptimo: {optimo['num_cajas']} cajas · ${optimo['costos']['costo_total']:.2f} USD", file=sys.stderr)
+
+    escribir_resultados(config, resultados, args.salida, formato, args.incluir_replicas)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,113 @@
 # --- interfaz_simulacion.py ---
 
 import math
+import queue
+import sqlite3
+import threading
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, ttk, filedialog
 
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
 from analizador_costos import AnalizadorCostos
-from simulador_colas import SimuladorColas
-
-# ### CAMBIO CLAVE: LIBRERÍAS DE EXPORTACIÓN MEJORADAS ###
-try:
-    import pandas as pd
-except ImportError:
-    pd = None
-
-try:
-    from reportlab.lib.pagesizes import letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.lib.units import inch
-except ImportError:
-    SimpleDocTemplate = None
+from barrido import ESTRATEGIA_EXHAUSTIVA, ESTRATEGIA_LOCAL, VARIACIONES_SENSIBILIDAD, SimulacionCancelada, ejecutar_barrido, ejecutar_sensibilidad, recalcular_costos
+from cache_replicas import CacheReplicas
+
+# matplotlib, pandas y reportlab tardan casi un segundo en importarse: se cargan
+# recién al dibujar el primer gráfico o al exportar, no al abrir la ventana
+plt = None
+FigureCanvasTkAgg = None
+
+
+def cargar_matplotlib():
+    """Importa matplotlib (pyplot y el backend de Tk) la primera vez que se necesita."""
+    global plt, FigureCanvasTkAgg
+    if plt is None:
+        import matplotlib.pyplot as pyplot
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as canvas_tk
+        plt, FigureCanvasTkAgg = pyplot, canvas_tk
+
+# Parámetros ofrecidos en la pestaña de sensibilidad: etiqueta -> clave de la configuración
+PARAMETROS_SENSIBILIDAD = {
+    "Tasa de llegadas (λ)": "lambda_llegadas",
+    "Tiempo de escaneo por artículo (s)": "t_scan_normal",
+    "Costo por caja (USD/min)": "costo_caja",
+    "Costo de espera (USD/min)": "costo_espera",
+    "Penalización SLA (USD/punto %)": "costo_sla",
+}
+
+# Factores sobre los costos actuales que forman la grilla del mapa de óptimos (incluyen 1.0)
+FACTORES_GRILLA = [0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0]
+FACTORES_GRILLA_SLA = [0.0, 0.5, 1.0, 1.5, 2.0]
+
+
+def calcular_mapa_optimos(config, resultados):
+    """Evalúa la grilla de costos alrededor de los costos actuales (ver AnalizadorCostos.evaluar_grilla_costos)."""
+    return AnalizadorCostos.evaluar_grilla_costos(
+        resultados["por_cajas"], config,
+        [config["costo_caja"] * f for f in FACTORES_GRILLA], [config["costo_espera"] * f for f in FACTORES_GRILLA],
+        [config["costo_sla"] * f for f in FACTORES_GRILLA_SLA],
+    )
+
+
+def crear_grilla(parent, columnas, filas, destacadas=(), hijos=None, alto=15, color_encabezado="#1976D2"):
+    """Tabla nativa (ttk.Treeview) con columnas ordenables al hacer clic en el encabezado.
+
+    filas es una lista de (textos, claves_de_orden); las filas cuyo índice está
+    en destacadas se resaltan. Si se pasa hijos(i), la fila i se puede expandir
+    y sus subfilas se insertan recién al abrirla. Treeview solo dibuja las filas
+    visibles, así que la tabla sigue fluida con miles de filas.
+    """
+    contenedor = tk.Frame(parent, bg="white")
+    ids = [str(j) for j in range(len(columnas))]
+    nombre_estilo = f"Grilla{color_encabezado.lstrip('#')}.Treeview"  # Un estilo por color de encabezado
+    estilo = ttk.Style(parent); estilo.configure(f"{nombre_estilo}.Heading", font=("Arial", 10, "bold"), foreground=color_encabezado); estilo.configure(nombre_estilo, rowheight=24, font=("Arial", 10))
+    arbol = ttk.Treeview(contenedor, columns=ids, show="tree headings" if hijos else "headings", height=min(alto, max(len(filas), 1)), style=nombre_estilo)
+    barra = ttk.Scrollbar(contenedor, orient="vertical", command=arbol.yview); arbol.configure(yscrollcommand=barra.set)
+    arbol.tag_configure("destacada", background="#E8F5E9", font=("Arial", 10, "bold")); arbol.tag_configure("par", background="#F5F5F5"); arbol.tag_configure("subfila", foreground="#616161", font=("Arial", 9))
+    arbol.column("#0", width=30 if hijos else 0, stretch=False)
+    for j, id_columna in enumerate(ids): arbol.column(id_columna, anchor="center", width=110 if j == 0 else 90)
+
+    claves, pendientes, destacados = {}, {}, set()
+    for i, (textos, orden) in enumerate(filas):
+        item = arbol.insert("", "end", values=textos)
+        claves[item] = orden
+        if i in destacadas: destacados.add(item)
+        if hijos is not None:
+            pendientes[item] = i; arbol.insert(item, "end")  # Marcador para que aparezca el expansor
+
+    def pintar():
+        for posicion, item in enumerate(arbol.get_children()): arbol.item(item, tags=("destacada",) if item in destacados else (("par",) if posicion % 2 else ()))
+
+    orden_actual = {"columna": None, "descendente": False}
+
+    def ordenar(columna):
+        descendente = orden_actual["columna"] == columna and not orden_actual["descendente"]
+        orden_actual.update(columna=columna, descendente=descendente)
+        for posicion, item in enumerate(sorted(claves, key=lambda item: claves[item][columna], reverse=descendente)): arbol.move(item, "", posicion)
+        for j, nombre in enumerate(columnas): arbol.heading(ids[j], text=nombre + ((" ▼" if descendente else " ▲") if j == columna else ""))
+        pintar()
+
+    def expandir(_evento):
+        item = arbol.focus()
+        if item in pendientes:
+            i = pendientes.pop(item); arbol.delete(*arbol.get_children(item))
+            for textos, _orden in hijos(i): arbol.insert(item, "end", values=textos, tags=("subfila",))
+
+    for j, nombre in enumerate(columnas): arbol.heading(ids[j], text=nombre, command=lambda j=j: ordenar(j))
+    arbol.bind("<<TreeviewOpen>>", expandir)
+    pintar()
+    if destacados: arbol.see(next(iter(destacados)))
+    arbol.pack(side=tk.LEFT, fill=tk.BOTH, expand=True); barra.pack(side=tk.RIGHT, fill=tk.Y)
+    return contenedor
 
 # ### CAMBIO CLAVE: FUNCIÓN DE PDF MEJORADA ###
 def exportar_pdf_conclusiones(texto_conclusiones_completo):
     """Exporta las conclusiones detalladas a un archivo PDF bien formateado."""
-    if SimpleDocTemplate is None:
+    try:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Paragraph
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import inch
+    except ImportError:
         messagebox.showerror("Error de Librería", "La librería 'reportlab' no está instalada.\nPor favor, instálala para exportar a PDF (pip install reportlab).")
         return
 
@@ -61,7 +141,9 @@ def exportar_pdf_conclusiones(texto_conclusiones_completo):
 
 
 def exportar_excel_completo(config, resultados, resultados_sensibilidad):
-    if pd is None:
+    try:
+        import pandas as pd
+    except ImportError:
         messagebox.showerror("Error de Librería", "Las librerías 'pandas' y 'openpyxl' no están instaladas.\nPor favor, instálalas para exportar a Excel (pip install pandas openpyxl).")
         return
 
@@ -84,13 +166,14 @@ def exportar_excel_completo(config, resultados, resultados_sensibilidad):
                 "Parámetro": [
                     "--- PARÁMETROS DE ENTRADA ---", *list(config.keys()), "",
                     "--- RESULTADOS ÓPTIMOS ---", "Cajas Óptimas", "Costo Total Mínimo",
-                    "Desviación Estándar Costo", "Intervalo de Confianza 95%", "Costo Cajas", "Costo Espera", "Costo SLA",
+                    "Desviación Estándar Costo", "Intervalo de Confianza 95%", "Prob. Selección Correcta", "Costo Cajas", "Costo Espera", "Costo SLA",
                     "Cumplimiento SLA (%)", "Utilización (%)", "Tiempo Sistema (min)"
                 ],
                 "Valor": [
                     "", *list(config.values()), "",
                     "", optimo['num_cajas'], f"${optimo['costos']['costo_total']:.2f}",
                     f"±${optimo['desv_est']:.2f}", f"[${ic_95_lower:.2f} - ${ic_95_upper:.2f}]",
+                    "N/D" if resultados.get("pcs") is None else f"{resultados['pcs'] * 100:.1f}%",
                     f"${optimo['costos']['costo_cajas']:.2f}", f"${optimo['costos']['costo_espera']:.2f}", f"${optimo['costos']['costo_sla']:.2f}",
                     f"{optimo['metricas']['porcentaje_sla']:.1f}%", f"{optimo['metricas']['utilizacion']:.1f}%", f"{optimo['metricas']['tiempo_sistema_prom']:.2f}"
                 ]
@@ -104,6 +187,8 @@ def exportar_excel_completo(config, resultados, resultados_sensibilidad):
                     "Cajas": r["num_cajas"],
                     "Costo Total Promedio": r["costos"]["costo_total"],
                     "Desv. Est. Costo": r["desv_est"],
+                    "Semiancho IC 95%": r["semiancho_ic"],
+                    "Réplicas Usadas": r["num_replicas"],
                     "Costo Cajas Promedio": r["costos"]["costo_cajas"],
                     "Costo Espera Promedio": r["costos"]["costo_espera"],
                     "Costo SLA Promedio": r["costos"]["costo_sla"],
@@ -145,36 +230,63 @@ def exportar_excel_completo(config, resultados, resultados_sensibilidad):
                 for r in resultados_sensibilidad:
                     df_sens.append({
                         "Variación (%)": r["variacion"],
+                        "Parámetro": r["parametro"],
+                        "Valor": r["valor"],
                         "Lambda (clientes/min)": r["lambda"],
                         "Cajas Óptimas": r["optimo"]["num_cajas"],
                         "Costo Óptimo": r["optimo"]["costo_total"],
                     })
                 pd.DataFrame(df_sens).to_excel(writer, sheet_name="Análisis de Sensibilidad", index=False)
 
-            # --- Hoja 5: LÉAME - Diccionario de Datos ---
+            # --- Hoja 5: Mapa de Óptimos (grilla de costos, se omite sin numpy) ---
+            try:
+                mapa = calcular_mapa_optimos(config, resultados)
+            except ImportError:
+                mapa = None
+            if mapa is not None:
+                df_mapa = []
+                for i, costo_caja in enumerate(mapa["costos_caja"]):
+                    for j, costo_espera in enumerate(mapa["costos_espera"]):
+                        for k, costo_sla in enumerate(mapa["costos_sla"]):
+                            df_mapa.append({
+                                "Costo Caja": costo_caja,
+                                "Costo Espera": costo_espera,
+                                "Costo SLA": costo_sla,
+                                "Cajas Óptimas": int(mapa["num_cajas_optimo"][i, j, k]),
+                                "Costo Óptimo": float(mapa["costo_optimo"][i, j, k]),
+                            })
+                pd.DataFrame(df_mapa).to_excel(writer, sheet_name="Mapa de Óptimos", index=False)
+
+            # --- Hoja 6: LÉAME - Diccionario de Datos ---
             diccionario_datos = {
                 "Hoja": [
-                    "Resumen", "Resumen",
-                    "Resultados Agregados", "Resultados Agregados", "Resultados Agregados",
+                    "Resumen", "Resumen", "Resumen",
+                    "Resultados Agregados", "Resultados Agregados", "Resultados Agregados", "Resultados Agregados",
                     "Datos Crudos por Replica", "Datos Crudos por Replica",
-                    "Análisis de Sensibilidad", "Análisis de Sensibilidad",
+                    "Análisis de Sensibilidad", "Análisis de Sensibilidad", "Análisis de Sensibilidad",
+                    "Mapa de Óptimos",
                 ],
                 "Columna": [
-                    "Parámetro", "Valor",
-                    "Costo Total Promedio", "Desv. Est. Costo", "SLA Promedio %",
+                    "Parámetro", "Valor", "Prob. Selección Correcta",
+                    "Costo Total Promedio", "Desv. Est. Costo", "Réplicas Usadas", "SLA Promedio %",
                     "Costo Total", "Replica N°",
-                    "Lambda (clientes/min)", "Costo Óptimo"
+                    "Parámetro", "Lambda (clientes/min)", "Costo Óptimo",
+                    "Cajas Óptimas",
                 ],
                 "Descripción": [
                     "Nombre del parámetro de entrada o de la métrica de resultado.",
                     "Valor utilizado en la simulación o valor óptimo calculado.",
+                    "Cota de Bonferroni de elegir el verdadero óptimo, calculada sobre las diferencias de costo réplica a réplica contra la mejor configuración.",
                     "El costo total promedio de todas las réplicas para esa configuración de cajas.",
                     "La desviación estándar del costo total, mide la variabilidad o riesgo.",
+                    "Réplicas simuladas para esa configuración (en modo adaptativo varía según el semiancho del IC 95%).",
                     "El porcentaje promedio de clientes que cumplieron el SLA en todas las réplicas.",
                     "El costo total para una única corrida/réplica de la simulación.",
                     "El identificador de la corrida individual (de 1 al N° de réplicas).",
+                    "Clave de la configuración que se varió; su valor en el escenario está en la columna Valor.",
                     "La tasa de llegada de clientes modificada para ese escenario de sensibilidad.",
-                    "El costo total mínimo encontrado para esa tasa de llegada específica."
+                    "El costo total mínimo encontrado para esa tasa de llegada específica.",
+                    "Número de cajas de menor costo para esa combinación de costos (recalculado con las mismas réplicas; la hoja solo se genera si numpy está instalado).",
                 ]
             }
             pd.DataFrame(diccionario_datos).to_excel(writer, sheet_name="LÉAME - Diccionario", index=False)
@@ -211,11 +323,18 @@ class InterfazSimulacion:
         self.resultados = None
         self.resultados_sensibilidad = None
         self.sensibilidad_ejecutada = False
+        self.cancelado = None  # threading.Event del trabajo en segundo plano activo
+        # Réplicas ya simuladas (persisten entre sesiones), compartidas entre barrido y sensibilidad
+        try:
+            self.cache_replicas = CacheReplicas()
+        except (OSError, sqlite3.Error):
+            self.cache_replicas = {}  # Sin disco disponible: caché solo en memoria
 
         self.crear_pantalla_configuracion()
 
     def crear_pantalla_configuracion(self):
         # ... (esta función y las de crear secciones no cambian)
+        self.cancelar_trabajo()
         for widget in self.root.winfo_children():
             widget.destroy()
         canvas_config = tk.Canvas(self.root, bg="#f0f0f0")
@@ -272,9 +391,25 @@ class InterfazSimulacion:
         frame = tk.LabelFrame(parent, text="🔬 Parámetros de Simulación", font=("Arial", 14, "bold"), bg="#FFF3E0", fg="#E65100", padx=20, pady=15)
         frame.pack(fill=tk.X, pady=(0, 15))
         self.entry_num_replicas = self.crear_campo(frame, "Número de réplicas:", 20)
+        self.var_replicas_adaptativas = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame, text="Réplicas adaptativas (hasta alcanzar el IC 95% objetivo)", variable=self.var_replicas_adaptativas, font=("Arial", 11), bg=frame["bg"], activebackground=frame["bg"], anchor="w").pack(fill=tk.X, pady=5)
+        self.entry_semiancho_objetivo = self.crear_campo(frame, "Semiancho IC 95% objetivo (USD):", 10)
+        self.entry_max_replicas = self.crear_campo(frame, "Máximo de réplicas por configuración:", 200)
+        self.var_seleccion_ocba = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame, text="Selección OCBA (réplicas extra a los candidatos al óptimo)", variable=self.var_seleccion_ocba, font=("Arial", 11), bg=frame["bg"], activebackground=frame["bg"], anchor="w").pack(fill=tk.X, pady=5)
+        self.entry_presupuesto_ocba = self.crear_campo(frame, "Réplicas extra OCBA (presupuesto):", 200)
         self.entry_tiempo_sim = self.crear_campo(frame, "Tiempo de simulación (min):", 60)
         self.entry_lambda = self.crear_campo(frame, "Tasa de llegadas (clientes/min):", 5)
         self.entry_max_cajas = self.crear_campo(frame, "Máximo de cajas a probar:", 10)
+        self.entry_num_workers = self.crear_campo(frame, "Procesos en paralelo:", 1)
+        self.entry_semilla = self.crear_campo(frame, "Semilla base:", 0)
+        self.var_demanda_compartida = tk.BooleanVar(value=True)
+        tk.Checkbutton(frame, text="Generar la demanda una vez por réplica (un lote por réplica)", variable=self.var_demanda_compartida, font=("Arial", 11), bg=frame["bg"], activebackground=frame["bg"], anchor="w").pack(fill=tk.X, pady=5)
+        self.var_prefiltro_erlang = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame, text="Prefiltro analítico (Erlang C): omitir cajas descartables", variable=self.var_prefiltro_erlang, font=("Arial", 11), bg=frame["bg"], activebackground=frame["bg"], anchor="w").pack(fill=tk.X, pady=5)
+        self.var_busqueda_local = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame, text="Búsqueda local del óptimo (desde λ/μ, sin barrer todas las cajas)", variable=self.var_busqueda_local, font=("Arial", 11), bg=frame["bg"], activebackground=frame["bg"], anchor="w").pack(fill=tk.X, pady=5)
+        self.entry_paciencia = self.crear_campo(frame, "Paciencia (pasos sin mejora):", 2)
 
     def crear_campo(self, parent, etiqueta, valor_default):
         frame = tk.Frame(parent, bg=parent["bg"])
@@ -296,13 +431,21 @@ class InterfazSimulacion:
                 "sla_objetivo": float(self.entry_sla_objetivo.get()), "umbral_tiempo": float(self.entry_umbral_tiempo.get()),
                 "num_replicas": int(self.entry_num_replicas.get()), "tiempo_simulacion": float(self.entry_tiempo_sim.get()),
                 "lambda_llegadas": float(self.entry_lambda.get()), "max_cajas": int(self.entry_max_cajas.get()),
+                "num_workers": int(self.entry_num_workers.get()), "semilla": int(self.entry_semilla.get()),
+                # La interfaz solo usa métricas agregadas: no se retienen los objetos Cliente
+                "conservar_clientes": False, "demanda_compartida": self.var_demanda_compartida.get(),
+                "prefiltro_erlang": self.var_prefiltro_erlang.get(),
+                "estrategia_busqueda": ESTRATEGIA_LOCAL if self.var_busqueda_local.get() else ESTRATEGIA_EXHAUSTIVA,
+                "paciencia": int(self.entry_paciencia.get()),
+                "replicas_adaptativas": self.var_replicas_adaptativas.get(),
+                "semiancho_objetivo": float(self.entry_semiancho_objetivo.get()), "max_replicas": int(self.entry_max_replicas.get()),
+                "seleccion_ocba": self.var_seleccion_ocba.get(), "presupuesto_ocba": int(self.entry_presupuesto_ocba.get()),
             }
             self.mostrar_progreso()
         except ValueError as exc:
             messagebox.showerror("Error", f"Por favor ingrese valores numéricos válidos.\n{exc}")
 
     def mostrar_progreso(self):
-        # ... (esta función no cambia)
         for widget in self.root.winfo_children(): widget.destroy()
         frame = tk.Frame(self.root, bg="#f0f0f0")
         frame.pack(expand=True)
@@ -311,44 +454,110 @@ class InterfazSimulacion:
         self.progress_label.pack(pady=10)
         self.progress_bar = ttk.Progressbar(frame, length=400, mode="determinate")
         self.progress_bar.pack(pady=20)
+        self.parcial_label = tk.Label(frame, text="", font=("Arial", 12), bg="#f0f0f0", fg="#1B5E20")
+        self.parcial_label.pack(pady=5)
+        tk.Button(frame, text="⛔ Cancelar", font=("Arial", 12, "bold"), bg="#F44336", fg="white", command=self.cancelar_trabajo, padx=20, pady=8).pack(pady=15)
         self.root.after(100, self.procesar_simulacion)
 
+    def ejecutar_en_segundo_plano(self, trabajo, manejadores):
+        """Ejecuta trabajo(publicar, cancelado) en un hilo sin bloquear el bucle de Tk.
+
+        El hilo publica mensajes (tipo, datos) en una cola que se revisa con
+        root.after; manejadores asocia cada tipo con su callback. Siempre se
+        publican "fin" (con el resultado) o "cancelado" al terminar; de los
+        mensajes "progreso" solo se procesa el más reciente de cada revisión.
+        """
+        cola = queue.Queue()
+        cancelado = threading.Event()
+        self.cancelado = cancelado
+
+        def hilo():
+            try:
+                resultado = trabajo(lambda tipo, datos: cola.put((tipo, datos)), cancelado)
+                cola.put(("fin", resultado))
+            except SimulacionCancelada:
+                cola.put(("cancelado", None))
+            except Exception as exc:
+                cola.put(("error", exc))
+
+        def revisar_cola():
+            ultimo_progreso = None
+            while True:
+                try:
+                    tipo, datos = cola.get_nowait()
+                except queue.Empty:
+                    break
+                if tipo == "progreso":
+                    ultimo_progreso = datos
+                elif tipo in ("fin", "cancelado", "error"):
+                    if self.cancelado is cancelado:
+                        self.cancelado = None
+                    if tipo == "error":
+                        messagebox.showerror("Error en la Simulación", f"La simulación falló:\n{datos}")
+                        manejadores["cancelado"](None)
+                    else:
+                        manejadores[tipo](datos)
+                    return
+                else:
+                    manejadores[tipo](datos)
+            if ultimo_progreso is not None:
+                manejadores["progreso"](ultimo_progreso)
+            self.root.after(100, revisar_cola)
+
+        threading.Thread(target=hilo, daemon=True).start()
+        self.root.after(100, revisar_cola)
+
+    def cancelar_trabajo(self):
+        """Pide detener el trabajo en segundo plano activo (si existe)."""
+        if self.cancelado is not None:
+            self.cancelado.set()
+
     def procesar_simulacion(self):
-        simulador = SimuladorColas(self.config)
-        resultados_por_cajas = []
-        max_cajas = self.config["max_cajas"]
-        num_replicas = self.config["num_replicas"]
-
-        for s in range(1, max_cajas + 1):
-            progreso = (s / max_cajas) * 100
-            self.progress_bar["value"] = progreso
-            self.progress_label["text"] = f"Simulando configuración con {s} caja(s)... ({s}/{max_cajas})"
-            self.root.update()
-
-            resultados_replicas = simulador.simular_replicas(s, num_replicas)
-            metricas_prom = AnalizadorCostos.agregar_resultados_replicas(resultados_replicas)
-
-            costos_replicas = [AnalizadorCostos.calcular_costos(r, s, self.config) for r in resultados_replicas]
-            costos_prom = {k: sum(c[k] for c in costos_replicas) / num_replicas for k in costos_replicas[0]}
-            desv_est = AnalizadorCostos.calcular_desviacion(costos_replicas, costos_prom["costo_total"])
-
-            resultados_por_cajas.append({
-                "num_cajas": s, 
-                "metricas": metricas_prom, 
-                "costos": costos_prom, 
-                "desv_est": desv_est, 
-                "replicas": resultados_replicas
-            })
-
-        self.resultados = {
-            "por_cajas": resultados_por_cajas, 
-            "optimo": min(resultados_por_cajas, key=lambda x: x["costos"]["costo_total"])
-        }
-
-        self.mostrar_resultados()
+        config = dict(self.config)
+
+        def trabajo(publicar, cancelado):
+            return ejecutar_barrido(
+                config,
+                progreso=lambda *datos: publicar("progreso", datos),
+                cancelado=cancelado,
+                parcial=lambda resumen: publicar("parcial", resumen),
+                cache=self.cache_replicas,
+            )
+
+        def actualizar_progreso(datos):
+            completadas, total, num_cajas = datos
+            self.progress_bar["value"] = (completadas / total) * 100
+            self.progress_label["text"] = f"Simulando réplicas... ({completadas}/{total}) · última: {num_cajas} caja(s)"
+
+        mejor_parcial = {}
+
+        def mostrar_parcial(resumen):
+            if not mejor_parcial or resumen["costos"]["costo_total"] < mejor_parcial["costos"]["costo_total"]:
+                mejor_parcial.update(resumen)
+            self.parcial_label["text"] = (
+                f"{resumen['num_cajas']} caja(s) listas: ${resumen['costos']['costo_total']:.2f} USD · "
+                f"mejor hasta ahora: {mejor_parcial['num_cajas']} caja(s) (${mejor_parcial['costos']['costo_total']:.2f} USD)"
+            )
+
+        def terminar(resultados):
+            self.resultados = resultados
+            self.mostrar_resultados()
+
+        def cancelar(_):
+            if self.progress_bar.winfo_exists():
+                self.crear_pantalla_configuracion()
+
+        self.ejecutar_en_segundo_plano(trabajo, {
+            "progreso": actualizar_progreso,
+            "parcial": mostrar_parcial,
+            "fin": terminar,
+            "cancelado": cancelar,
+        })
 
     def mostrar_resultados(self):
         """Muestra los resultados de la simulación."""
+        # Al reconstruir la pantalla se detiene el trabajo en curso (p. ej. un análisis de sensibilidad)
+        self.cancelar_trabajo()
         for widget in self.root.winfo_children():
             widget.destroy()
 
@@ -360,13 +569,23 @@ class InterfazSimulacion:
         notebook = ttk.Notebook(self.root)
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
 
-        # Crear todas las pestañas
-        self.crear_pestana_resumen(notebook)
-        self.crear_pestana_graficos(notebook)
-        self.crear_pestana_tabla(notebook)
-        self.crear_pestana_sensibilidad(notebook)
-        self.crear_pestana_regla(notebook)
-        self.crear_pestana_conclusiones(notebook)
+        # Las pestañas se agregan vacías y se dibujan la primera vez que se seleccionan
+        self.pestanas_pendientes = {}
+        for titulo, crear in (
+            ("📊 Resumen Ejecutivo", self.crear_pestana_resumen),
+            ("📈 Gráficos", self.crear_pestana_graficos),
+            ("📋 Tabla Detallada", self.crear_pestana_tabla),
+            ("💲 Re-cotizar Costos", self.crear_pestana_recotizar),
+            ("🗺️ Mapa de Óptimos", self.crear_pestana_mapa_optimos),
+            ("🔍 Análisis de Sensibilidad", self.crear_pestana_sensibilidad),
+            ("📜 Regla de Apertura", self.crear_pestana_regla),
+            ("📝 Conclusiones", self.crear_pestana_conclusiones),
+        ):
+            frame = tk.Frame(notebook, bg="white")
+            notebook.add(frame, text=titulo)
+            self.pestanas_pendientes[str(frame)] = crear
+        notebook.bind("<<NotebookTabChanged>>", lambda _evento: self.dibujar_pestana(notebook))
+        self.dibujar_pestana(notebook)
 
         # ### CAMBIO CLAVE: BOTONES UNIFICADOS Y CON FUNCIONALIDAD CORREGIDA ###
         
@@ -381,10 +600,15 @@ class InterfazSimulacion:
     # El resto de tus funciones (crear_pestana_resumen, etc.) no necesitan cambios.
     # Las incluyo para que el archivo esté completo y puedas copiarlo directamente.
     
-    def crear_pestana_resumen(self, notebook):
+    def dibujar_pestana(self, notebook):
+        """Dibuja la pestaña seleccionada si todavía está vacía; luego queda armada."""
+        seleccionada = notebook.select()
+        crear = self.pestanas_pendientes.pop(seleccionada, None)
+        if crear is not None:
+            crear(notebook.nametowidget(seleccionada))
+
+    def crear_pestana_resumen(self, frame):
         #...código sin cambios...
-        frame = tk.Frame(notebook, bg="white")
-        notebook.add(frame, text="📊 Resumen Ejecutivo")
         tk.Label(frame, text="📊 Resultados de la Simulación - Resumen Ejecutivo", font=("Arial", 20, "bold"), bg="white", fg="#1976D2").pack(pady=20)
         cards_frame = tk.Frame(frame, bg="white")
         cards_frame.pack(pady=20)
@@ -406,6 +630,8 @@ class InterfazSimulacion:
         COSTO TOTAL:                 ${optimo['costos']['costo_total']:.2f} USD
         """
         tk.Label(desglose_frame, text=costos_text, font=("Courier", 12), bg="white", justify=tk.LEFT).pack()
+        if self.resultados.get("pcs") is not None:
+            tk.Label(frame, text=f"🎲 Probabilidad de selección correcta del óptimo: {self.resultados['pcs'] * 100:.1f}%", font=("Arial", 12, "bold"), bg="white", fg="#1976D2").pack(pady=5)
 
     def crear_tarjeta(self, parent, titulo, valor, color, row, col):
         #...código sin cambios...
@@ -414,10 +640,9 @@ class InterfazSimulacion:
         tk.Label(card, text=titulo, font=("Arial", 12, "bold"), bg=color, fg="white").pack()
         tk.Label(card, text=valor, font=("Arial", 24, "bold"), bg=color, fg="white").pack(pady=10)
 
-    def crear_pestana_graficos(self, notebook):
+    def crear_pestana_graficos(self, frame):
         #...código sin cambios...
-        frame = tk.Frame(notebook, bg="white")
-        notebook.add(frame, text="📈 Gráficos")
+        cargar_matplotlib()
         canvas_graficos = tk.Canvas(frame, bg="white")
         scrollbar_graficos = tk.Scrollbar(frame, orient="vertical", command=canvas_graficos.yview)
         frame_graficos = tk.Frame(canvas_graficos, bg="white")
@@ -452,8 +677,9 @@ class InterfazSimulacion:
         bars = ax4.bar(num_cajas, utilizacion, color="#9C27B0", width=0.6, label="Utilización")
         ax4.set_xlabel("Número de Cajas (s)", fontsize=12, fontweight="bold"); ax4.set_ylabel("Utilización (%)", fontsize=12, fontweight="bold"); ax4.set_title("⚙️ Utilización de Cajas", fontsize=13, fontweight="bold", pad=12)
         ax4.grid(True, alpha=0.3, axis="y", linestyle='--'); ax4.set_xticks(num_cajas)
-        optimo_idx = self.resultados["optimo"]["num_cajas"] - 1
-        if optimo_idx < len(bars): bars[optimo_idx].set_color("#F44336")
+        # Con prefiltro los números de cajas no son contiguos: se busca la barra del óptimo
+        optimo_idx = num_cajas.index(self.resultados["optimo"]["num_cajas"])
+        bars[optimo_idx].set_color("#F44336")
         ax4.legend(fontsize=10, loc='upper right')
         canvas = FigureCanvasTkAgg(fig, frame_graficos)
         canvas.draw()
@@ -461,91 +687,207 @@ class InterfazSimulacion:
         canvas_graficos.pack(side="left", fill="both", expand=True)
         scrollbar_graficos.pack(side="right", fill="y")
 
-    def crear_pestana_tabla(self, notebook):
-        #...código sin cambios...
-        frame = tk.Frame(notebook, bg="white")
-        notebook.add(frame, text="📋 Tabla Detallada")
-        canvas_tabla = tk.Canvas(frame, bg="white")
-        scrollbar_tabla = tk.Scrollbar(frame, orient="vertical", command=canvas_tabla.yview)
-        frame_tabla = tk.Frame(canvas_tabla, bg="white")
-        frame_tabla.bind("<Configure>", lambda e: canvas_tabla.configure(scrollregion=canvas_tabla.bbox("all")))
-        canvas_tabla.create_window((0, 0), window=frame_tabla, anchor="nw")
-        canvas_tabla.configure(yscrollcommand=scrollbar_tabla.set)
-        tk.Label(frame_tabla, text="📋 Matriz de Resultados por Configuración", font=("Arial", 18, "bold"), bg="white", fg="#1976D2").pack(pady=15)
+    def crear_pestana_tabla(self, frame):
+        """Tabla de resultados por configuración; cada fila se expande en sus réplicas."""
+        tk.Label(frame, text="📋 Matriz de Resultados por Configuración", font=("Arial", 18, "bold"), bg="white", fg="#1976D2").pack(pady=15)
         resultados = self.resultados["por_cajas"]; optimo_num = self.resultados["optimo"]["num_cajas"]
-        columnas = ["Cajas", "C.Total", "C.Cajas", "C.Espera", "C.SLA", "SLA%", "Util.%", "T.Sistema", "T.Espera", "Desv.Est"]
-        datos = [[f"{'★ ' if r['num_cajas'] == optimo_num else ''}{r['num_cajas']}", f"${r['costos']['costo_total']:.2f}", f"${r['costos']['costo_cajas']:.2f}", f"${r['costos']['costo_espera']:.2f}", f"${r['costos']['costo_sla']:.2f}", f"{r['metricas']['porcentaje_sla']:.1f}%", f"{r['metricas']['utilizacion']:.1f}%", f"{r['metricas']['tiempo_sistema_prom']:.2f}m", f"{r['metricas']['tiempo_espera_prom']:.2f}m", f"±${r['desv_est']:.2f}"] for r in resultados]
-        fig_tabla, ax_tabla = plt.subplots(figsize=(13, max(6, len(datos) * 0.4))); fig_tabla.patch.set_facecolor("white"); ax_tabla.axis('tight'); ax_tabla.axis('off')
-        tabla = ax_tabla.table(cellText=datos, colLabels=columnas, cellLoc='center', loc='center')
-        tabla.auto_set_font_size(False); tabla.set_fontsize(9); tabla.scale(1, 2)
-        for i in range(len(columnas)): tabla[(0, i)].set_facecolor('#1976D2'); tabla[(0, i)].set_text_props(weight='bold', color='white')
-        for i in range(1, len(datos) + 1):
-            for j in range(len(columnas)): tabla[(i, j)].set_facecolor('#E8F5E9' if i - 1 == optimo_num - 1 else ('#F5F5F5' if i % 2 == 0 else 'white'))
-        plt.subplots_adjust(left=0.05, right=0.95, top=0.95, bottom=0.05)
-        canvas_tabla_fig = FigureCanvasTkAgg(fig_tabla, frame_tabla); canvas_tabla_fig.draw(); canvas_tabla_fig.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        tk.Label(frame_tabla, text=f"★ = Configuración Óptima ({optimo_num} cajas) | Número de Réplicas: {self.config['num_replicas']}", font=("Arial", 11, "bold"), bg="white", fg="#1976D2").pack(pady=10)
-        canvas_tabla.pack(side="left", fill="both", expand=True); scrollbar_tabla.pack(side="right", fill="y")
-    
-    def crear_pestana_sensibilidad(self, notebook):
+        columnas = ["Cajas", "C.Total", "C.Cajas", "C.Espera", "C.SLA", "SLA%", "Util.%", "T.Sistema", "T.Espera", "Desv.Est", "Réplicas"]
+
+        def fila(etiqueta, costos, metricas, desv_est="", num_replicas=""):
+            textos = [etiqueta, f"${costos['costo_total']:.2f}", f"${costos['costo_cajas']:.2f}", f"${costos['costo_espera']:.2f}", f"${costos['costo_sla']:.2f}", f"{metricas['porcentaje_sla']:.1f}%", f"{metricas['utilizacion']:.1f}%", f"{metricas['tiempo_sistema_prom']:.2f}m", f"{metricas['tiempo_espera_prom']:.2f}m", f"±${desv_est:.2f}" if desv_est != "" else "", f"{num_replicas}"]
+            orden = [costos["costo_total"], costos["costo_cajas"], costos["costo_espera"], costos["costo_sla"], metricas["porcentaje_sla"], metricas["utilizacion"], metricas["tiempo_sistema_prom"], metricas["tiempo_espera_prom"]]
+            return textos, orden
+
+        filas = []
+        for r in resultados:
+            textos, orden = fila(f"{'★ ' if r['num_cajas'] == optimo_num else ''}{r['num_cajas']}", r["costos"], r["metricas"], r["desv_est"], r["num_replicas"])
+            filas.append((textos, [r["num_cajas"], *orden, r["desv_est"], r["num_replicas"]]))
+
+        def replicas(i):
+            r = resultados[i]
+            return [fila(f"réplica {k}", AnalizadorCostos.calcular_costos(metricas, r["num_cajas"], self.config), metricas) for k, metricas in enumerate(r["replicas"], start=1)]
+
+        destacadas = [i for i, r in enumerate(resultados) if r["num_cajas"] == optimo_num]
+        crear_grilla(frame, columnas, filas, destacadas, hijos=replicas, alto=25).pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        tk.Label(frame, text=f"★ = Configuración Óptima ({optimo_num} cajas) | Réplicas del óptimo: {self.resultados['optimo']['num_replicas']} | Clic en un encabezado para ordenar; ▸ para ver las réplicas", font=("Arial", 11, "bold"), bg="white", fg="#1976D2").pack(pady=10)
+
+    def crear_pestana_recotizar(self, frame):
+        """Pestaña what-if: re-cotiza los resultados al mover los costos, sin volver a simular."""
+        cargar_matplotlib()
+        tk.Label(frame, text="💲 Re-cotizar con Otros Costos (sin volver a simular)", font=("Arial", 18, "bold"), bg="white", fg="#1976D2").pack(pady=15)
+        controles = tk.Frame(frame, bg="white"); controles.pack(fill=tk.X, padx=30)
+        parametros = [
+            ("costo_caja", "Costo por caja activa (USD/min)"), ("costo_espera", "Costo tiempo espera (USD/min por cliente)"),
+            ("costo_sla", "Penalización SLA (USD por punto %)"), ("sla_objetivo", "SLA objetivo (%)"),
+        ]
+        variables = {}
+        for fila, (clave, etiqueta) in enumerate(parametros):
+            valor = self.config[clave]
+            maximo = 100 if clave == "sla_objetivo" else max(4 * valor, 1)
+            tk.Label(controles, text=etiqueta, font=("Arial", 11), bg="white", anchor="w", width=40).grid(row=fila, column=0, sticky="w")
+            variables[clave] = tk.DoubleVar(value=valor)
+            tk.Scale(controles, variable=variables[clave], from_=0, to=maximo, resolution=maximo / 400, orient=tk.HORIZONTAL, length=450, bg="white", highlightthickness=0, command=lambda _valor: programar()).grid(row=fila, column=1, sticky="we")
+
+        optimo_label = tk.Label(frame, font=("Arial", 13, "bold"), bg="white", fg="#2E7D32"); optimo_label.pack(pady=10)
+        aviso_label = tk.Label(frame, font=("Arial", 10), bg="white", fg="#E65100"); aviso_label.pack()
+        fig, ax = plt.subplots(figsize=(11, 4.5)); fig.patch.set_facecolor("white")
+        num_cajas = [r["num_cajas"] for r in self.resultados["por_cajas"]]
+        ax.plot(num_cajas, [r["costos"]["costo_total"] for r in self.resultados["por_cajas"]], "o--", color="#BDBDBD", linewidth=1.5, label="Costos originales")
+        linea, = ax.plot([], [], "o-", color="#2196F3", linewidth=2.5, markersize=8, label="Costos re-cotizados")
+        marcador, = ax.plot([], [], "*", color="#F44336", markersize=20, label="Óptimo")
+        ax.set_xlabel("Número de Cajas (s)", fontsize=11, fontweight="bold"); ax.set_ylabel("Costo Total (USD)", fontsize=11, fontweight="bold")
+        ax.grid(True, alpha=0.3, linestyle='--'); ax.legend(fontsize=9); ax.set_xticks(num_cajas)
+        canvas = FigureCanvasTkAgg(fig, frame); canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        estado = {"pendiente": None, "resultados": None}
+
+        def config_recotizada():
+            return {**self.config, **{clave: variable.get() for clave, variable in variables.items()}}
+
+        def actualizar():
+            estado["pendiente"] = None
+            if not frame.winfo_exists(): return
+            nuevos = recalcular_costos(self.resultados, config_recotizada()); estado["resultados"] = nuevos
+            optimo = nuevos["optimo"]
+            linea.set_data(num_cajas, [r["costos"]["costo_total"] for r in nuevos["por_cajas"]])
+            marcador.set_data([optimo["num_cajas"]], [optimo["costos"]["costo_total"]])
+            ax.relim(); ax.autoscale_view(); canvas.draw_idle()
+            optimo_label["text"] = f"✅ Óptimo re-cotizado: {optimo['num_cajas']} cajas · ${optimo['costos']['costo_total']:.2f} USD (antes: {self.resultados['optimo']['num_cajas']} cajas)"
+            en_borde = (optimo["num_cajas"] == num_cajas[0] > 1) or (optimo["num_cajas"] == num_cajas[-1] < self.config["max_cajas"])
+            aviso_label["text"] = "⚠️ El óptimo quedó en el borde de las configuraciones simuladas: conviene volver a simular." if en_borde else ""
+
+        def programar():
+            # Agrupa los movimientos rápidos del deslizador en un solo recálculo
+            if estado["pendiente"] is None: estado["pendiente"] = self.root.after(50, actualizar)
+
+        def aplicar():
+            self.config = config_recotizada(); self.resultados = recalcular_costos(self.resultados, self.config)
+            # La sensibilidad depende de los costos: se vuelve a ejecutar (rápido, con la caché de réplicas)
+            self.resultados_sensibilidad = None; self.sensibilidad_ejecutada = False
+            self.mostrar_resultados()
+
+        tk.Button(frame, text="✅ Aplicar a Todos los Resultados", font=("Arial", 12, "bold"), bg="#4CAF50", fg="white", command=aplicar, padx=20, pady=8).pack(pady=10)
+        actualizar()
+
+    def crear_pestana_mapa_optimos(self, frame):
+        """Pestaña con el mapa de calor de cajas óptimas sobre una grilla de costos."""
+        tk.Label(frame, text="🗺️ Cajas Óptimas según los Costos", font=("Arial", 18, "bold"), bg="white", fg="#1976D2").pack(pady=15)
+        try:
+            mapa = calcular_mapa_optimos(self.config, self.resultados)
+        except ImportError as exc:
+            tk.Label(frame, text=str(exc), font=("Arial", 12), bg="white", fg="#666666").pack(pady=20)
+            return
+        cargar_matplotlib()
+        costos_sla = mapa["costos_sla"]
+        control = tk.Frame(frame, bg="white"); control.pack()
+        tk.Label(control, text="Penalización SLA (USD por punto %):", font=("Arial", 11), bg="white").pack(side=tk.LEFT)
+        indice_sla = tk.IntVar(value=FACTORES_GRILLA_SLA.index(1.0))
+        valor_sla_label = tk.Label(control, font=("Arial", 11, "bold"), bg="white", width=10); valor_sla_label.pack(side=tk.RIGHT)
+        tk.Scale(control, variable=indice_sla, from_=0, to=len(costos_sla) - 1, orient=tk.HORIZONTAL, showvalue=False, length=250, bg="white", highlightthickness=0, command=lambda _valor: dibujar()).pack(side=tk.LEFT, padx=10)
+
+        fig, ax = plt.subplots(figsize=(11, 7)); fig.patch.set_facecolor("white")
+        extension = [-0.5, len(mapa["costos_caja"]) - 0.5, -0.5, len(mapa["costos_espera"]) - 0.5]
+        imagen = ax.imshow(mapa["num_cajas_optimo"][:, :, 0].T, origin="lower", cmap="viridis", aspect="auto", extent=extension,
+                           vmin=mapa["num_cajas_optimo"].min(), vmax=mapa["num_cajas_optimo"].max())
+        fig.colorbar(imagen, ax=ax, label="Cajas óptimas")
+        ax.set_xticks(range(len(mapa["costos_caja"]))); ax.set_xticklabels([f"{c:.2f}" for c in mapa["costos_caja"]])
+        ax.set_yticks(range(len(mapa["costos_espera"]))); ax.set_yticklabels([f"{c:.2f}" for c in mapa["costos_espera"]])
+        ax.set_xlabel("Costo por caja activa (USD/min)", fontsize=11, fontweight="bold"); ax.set_ylabel("Costo de espera (USD/min por cliente)", fontsize=11, fontweight="bold")
+        # Los costos actuales corresponden al factor 1.0 de la grilla
+        actual = (FACTORES_GRILLA.index(1.0),) * 2
+        ax.add_patch(plt.Rectangle((actual[0] - 0.5, actual[1] - 0.5), 1, 1, fill=False, edgecolor="#F44336", linewidth=3))
+        textos = [[ax.text(i, j, "", ha="center", va="center", fontsize=10, fontweight="bold") for j in range(len(mapa["costos_espera"]))] for i in range(len(mapa["costos_caja"]))]
+        canvas = FigureCanvasTkAgg(fig, frame); canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def dibujar():
+            if not frame.winfo_exists(): return
+            k = indice_sla.get(); optimos = mapa["num_cajas_optimo"][:, :, k]
+            imagen.set_data(optimos.T); valor_sla_label["text"] = f"${costos_sla[k]:.2f}"
+            ax.set_title(f"Cajas óptimas con penalización SLA = ${costos_sla[k]:.2f} (recuadro rojo: costos actuales)", fontsize=13, fontweight="bold", pad=12)
+            for i, fila in enumerate(textos):
+                for j, texto in enumerate(fila):
+                    texto.set_text(str(optimos[i, j])); texto.set_color("white" if optimos[i, j] < imagen.norm.vmax * 0.6 + imagen.norm.vmin * 0.4 else "black")
+            canvas.draw_idle()
+
+        dibujar()
+
+    def crear_pestana_sensibilidad(self, frame):
         #...código sin cambios...
-        frame = tk.Frame(notebook, bg="white")
-        notebook.add(frame, text="🔍 Análisis de Sensibilidad")
         canvas_sens = tk.Canvas(frame, bg="white")
         scrollbar_sens = tk.Scrollbar(frame, orient="vertical", command=canvas_sens.yview)
         scrollable_frame_sens = tk.Frame(canvas_sens, bg="white")
         scrollable_frame_sens.bind("<Configure>", lambda e: canvas_sens.configure(scrollregion=canvas_sens.bbox("all")))
         canvas_sens.create_window((0, 0), window=scrollable_frame_sens, anchor="nw")
         canvas_sens.configure(yscrollcommand=scrollbar_sens.set)
-        tk.Label(scrollable_frame_sens, text="🔍 Análisis de Sensibilidad - Variación en Tasa de Llegadas", font=("Arial", 18, "bold"), bg="white", fg="#1976D2").pack(pady=15)
+        tk.Label(scrollable_frame_sens, text="🔍 Análisis de Sensibilidad - Variación de Parámetros", font=("Arial", 18, "bold"), bg="white", fg="#1976D2").pack(pady=15)
         if not self.sensibilidad_ejecutada:
             btn_frame = tk.Frame(scrollable_frame_sens, bg="white"); btn_frame.pack(pady=20)
-            tk.Label(btn_frame, text="El análisis de sensibilidad evalúa cómo cambia el costo óptimo\ncon variaciones de ±10% y ±20% en la tasa de llegadas (λ).", font=("Arial", 12), bg="white", justify=tk.CENTER).pack(pady=10)
-            tk.Button(btn_frame, text="▶️ Ejecutar Análisis de Sensibilidad", font=("Arial", 14, "bold"), bg="#FF9800", fg="white", command=lambda: self.ejecutar_sensibilidad(scrollable_frame_sens, canvas_sens), padx=30, pady=15).pack()
+            tk.Label(btn_frame, text="El análisis de sensibilidad evalúa cómo cambia el costo óptimo\ncuando un parámetro varía en los porcentajes indicados.", font=("Arial", 12), bg="white", justify=tk.CENTER).pack(pady=10)
+            opciones_frame = tk.Frame(btn_frame, bg="white"); opciones_frame.pack(pady=10)
+            tk.Label(opciones_frame, text="Parámetro:", font=("Arial", 11), bg="white").grid(row=0, column=0, sticky="w", padx=5, pady=3)
+            combo_parametro = ttk.Combobox(opciones_frame, values=list(PARAMETROS_SENSIBILIDAD), state="readonly", width=30); combo_parametro.current(0); combo_parametro.grid(row=0, column=1, padx=5, pady=3)
+            tk.Label(opciones_frame, text="Variaciones (%):", font=("Arial", 11), bg="white").grid(row=1, column=0, sticky="w", padx=5, pady=3)
+            entry_variaciones = tk.Entry(opciones_frame, font=("Arial", 11), width=32); entry_variaciones.insert(0, ", ".join(str(v) for v in VARIACIONES_SENSIBILIDAD)); entry_variaciones.grid(row=1, column=1, padx=5, pady=3)
+
+            def iniciar():
+                try:
+                    variaciones = [float(v) for v in entry_variaciones.get().replace(";", ",").split(",") if v.strip()]
+                except ValueError:
+                    messagebox.showerror("Error", "Las variaciones deben ser números separados por comas (ej: -20, -10, 0, 10, 20)."); return
+                if not variaciones:
+                    messagebox.showerror("Error", "Indique al menos una variación."); return
+                self.ejecutar_sensibilidad(scrollable_frame_sens, canvas_sens, PARAMETROS_SENSIBILIDAD[combo_parametro.get()], variaciones)
+
+            tk.Button(btn_frame, text="▶️ Ejecutar Análisis de Sensibilidad", font=("Arial", 14, "bold"), bg="#FF9800", fg="white", command=iniciar, padx=30, pady=15).pack()
         canvas_sens.pack(side="left", fill="both", expand=True); scrollbar_sens.pack(side="right", fill="y")
 
-    def ejecutar_sensibilidad(self, parent_frame, canvas_parent):
-        #...código sin cambios...
+    def ejecutar_sensibilidad(self, parent_frame, canvas_parent, parametro="lambda_llegadas", variaciones=VARIACIONES_SENSIBILIDAD):
         for widget in parent_frame.winfo_children(): widget.destroy()
         tk.Label(parent_frame, text="⏳ Ejecutando Análisis de Sensibilidad...", font=("Arial", 18, "bold"), bg="white", fg="#FF9800").pack(pady=20)
-        progress = ttk.Progressbar(parent_frame, length=400, mode="determinate"); progress.pack(pady=10); self.root.update()
-        variaciones = [-20, -10, 0, 10, 20]; resultados_sensibilidad = []
-        total_pasos = len(variaciones) * self.config["max_cajas"]; paso_actual = 0
-        for var in variaciones:
-            lambda_modificada = self.config["lambda_llegadas"] * (1 + var / 100); config_temp = self.config.copy(); config_temp["lambda_llegadas"] = lambda_modificada
-            simulador_temp = SimuladorColas(config_temp); resultados_var = []
-            for s in range(1, self.config["max_cajas"] + 1):
-                paso_actual += 1; progress["value"] = (paso_actual / total_pasos) * 100; self.root.update()
-                replicas = simulador_temp.simular_replicas(s, 10); metricas_prom = AnalizadorCostos.agregar_resultados_replicas(replicas)
-                costos_replicas = [AnalizadorCostos.calcular_costos(r, s, config_temp) for r in replicas]
-                costo_prom = sum(c["costo_total"] for c in costos_replicas) / len(costos_replicas); resultados_var.append({"num_cajas": s, "costo_total": costo_prom})
-            optimo_var = min(resultados_var, key=lambda x: x["costo_total"])
-            resultados_sensibilidad.append({"variacion": var, "lambda": lambda_modificada, "resultados": resultados_var, "optimo": optimo_var})
+        progress = ttk.Progressbar(parent_frame, length=400, mode="determinate"); progress.pack(pady=10)
+        tk.Button(parent_frame, text="⛔ Cancelar", font=("Arial", 12, "bold"), bg="#F44336", fg="white", command=self.cancelar_trabajo, padx=20, pady=8).pack(pady=10)
+        config = dict(self.config)
+
+        def trabajo(publicar, cancelado):
+            return ejecutar_sensibilidad(config, variaciones, progreso=lambda *datos: publicar("progreso", datos), cancelado=cancelado, parametro=parametro, cache=self.cache_replicas)
+
+        def actualizar_progreso(datos):
+            if progress.winfo_exists(): progress["value"] = (datos[0] / datos[1]) * 100
+
+        def terminar(resultados_sensibilidad):
+            if parent_frame.winfo_exists(): self.mostrar_sensibilidad(parent_frame, canvas_parent, resultados_sensibilidad)
+
+        def cancelar(_):
+            if not parent_frame.winfo_exists(): return
+            for widget in parent_frame.winfo_children(): widget.destroy()
+            tk.Label(parent_frame, text="Análisis de sensibilidad cancelado.", font=("Arial", 12), bg="white").pack(pady=10)
+            tk.Button(parent_frame, text="▶️ Ejecutar Análisis de Sensibilidad", font=("Arial", 14, "bold"), bg="#FF9800", fg="white", command=lambda: self.ejecutar_sensibilidad(parent_frame, canvas_parent, parametro, variaciones), padx=30, pady=15).pack()
+
+        self.ejecutar_en_segundo_plano(trabajo, {"progreso": actualizar_progreso, "fin": terminar, "cancelado": cancelar})
+
+    def mostrar_sensibilidad(self, parent_frame, canvas_parent, resultados_sensibilidad):
+        cargar_matplotlib()
         for widget in parent_frame.winfo_children(): widget.destroy()
         tk.Label(parent_frame, text="🔍 Resultados del Análisis de Sensibilidad", font=("Arial", 18, "bold"), bg="white", fg="#1976D2").pack(pady=15)
+        parametro = resultados_sensibilidad[0]["parametro"]
+        etiqueta = next((nombre for nombre, clave in PARAMETROS_SENSIBILIDAD.items() if clave == parametro), parametro)
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(13, 5.5)); fig.patch.set_facecolor("white"); plt.subplots_adjust(hspace=0.3, wspace=0.35, top=0.90, bottom=0.15)
-        for r in resultados_sensibilidad: ax1.plot([x["num_cajas"] for x in r["resultados"]], [x["costo_total"] for x in r["resultados"]], "o-", label=f"Tasa = {r['lambda']:.2f} ({r['variacion']:+d}%)", linewidth=2, markersize=6)
-        ax1.set_xlabel("Número de Cajas (s)", fontsize=11, fontweight="bold"); ax1.set_ylabel("Costo Total (USD)", fontsize=11, fontweight="bold"); ax1.set_title("💰 Costo Total vs Tasa de Llegadas (λ)", fontsize=12, fontweight="bold", pad=12); ax1.legend(fontsize=8, loc='best'); ax1.grid(True, alpha=0.3, linestyle='--')
+        for r in resultados_sensibilidad: ax1.plot([x["num_cajas"] for x in r["resultados"]], [x["costo_total"] for x in r["resultados"]], "o-", label=f"{r['valor']:.2f} ({r['variacion']:+g}%)", linewidth=2, markersize=6)
+        ax1.set_xlabel("Número de Cajas (s)", fontsize=11, fontweight="bold"); ax1.set_ylabel("Costo Total (USD)", fontsize=11, fontweight="bold"); ax1.set_title(f"💰 Costo Total vs {etiqueta}", fontsize=12, fontweight="bold", pad=12); ax1.legend(fontsize=8, loc='best'); ax1.grid(True, alpha=0.3, linestyle='--')
         variaciones_vals = [r["variacion"] for r in resultados_sensibilidad]; cajas_optimas = [r["optimo"]["num_cajas"] for r in resultados_sensibilidad]; costos_optimos = [r["optimo"]["costo_total"] for r in resultados_sensibilidad]; ax2_twin = ax2.twinx()
         line1 = ax2.plot(variaciones_vals, cajas_optimas, "o-", color="#2196F3", linewidth=2.5, markersize=9, label="Cajas Óptimas")
         line2 = ax2_twin.plot(variaciones_vals, costos_optimos, "s-", color="#F44336", linewidth=2.5, markersize=9, label="Costo Óptimo")
-        ax2.set_xlabel("Variación en Tasa de Llegadas (%)", fontsize=11, fontweight="bold"); ax2.set_ylabel("Número de Cajas Óptimas", fontsize=11, fontweight="bold", color="#2196F3"); ax2_twin.set_ylabel("Costo Total Óptimo (USD)", fontsize=11, fontweight="bold", color="#F44336")
+        ax2.set_xlabel(f"Variación en {etiqueta} (%)", fontsize=11, fontweight="bold"); ax2.set_ylabel("Número de Cajas Óptimas", fontsize=11, fontweight="bold", color="#2196F3"); ax2_twin.set_ylabel("Costo Total Óptimo (USD)", fontsize=11, fontweight="bold", color="#F44336")
         ax2.set_title("📊 Robustez de la Solución", fontsize=12, fontweight="bold", pad=12); ax2.grid(True, alpha=0.3, linestyle='--'); ax2.tick_params(axis='y', labelcolor="#2196F3"); ax2_twin.tick_params(axis='y', labelcolor="#F44336")
         lines1, labels1 = ax2.get_legend_handles_labels(); lines2, labels2 = ax2_twin.get_legend_handles_labels(); ax2.legend(lines1 + lines2, labels1 + labels2, loc="upper left", fontsize=9)
         canvas = FigureCanvasTkAgg(fig, parent_frame); canvas.draw(); canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         resumen_frame = tk.LabelFrame(parent_frame, text="📋 Resumen de Sensibilidad", font=("Arial", 13, "bold"), bg="white", padx=20, pady=15); resumen_frame.pack(fill=tk.X, padx=20, pady=15)
-        columnas_sens = ["Variación", "Lambda (λ)", "Cajas Óptimas", "Costo Óptimo"]; datos_sens = [[f"{r['variacion']:+d}%", f"{r['lambda']:.2f}", f"{r['optimo']['num_cajas']}", f"${r['optimo']['costo_total']:.2f}"] for r in resultados_sensibilidad]
-        fig_sens, ax_sens = plt.subplots(figsize=(10, 3.5)); fig_sens.patch.set_facecolor("white"); ax_sens.axis('tight'); ax_sens.axis('off')
-        tabla_sens = ax_sens.table(cellText=datos_sens, colLabels=columnas_sens, cellLoc='center', loc='center')
-        tabla_sens.auto_set_font_size(False); tabla_sens.set_fontsize(10); tabla_sens.scale(1, 2.5)
-        for i in range(len(columnas_sens)): tabla_sens[(0, i)].set_facecolor('#FF9800'); tabla_sens[(0, i)].set_text_props(weight='bold', color='white')
-        for i in range(1, len(datos_sens) + 1):
-            for j in range(len(columnas_sens)): tabla_sens[(i, j)].set_facecolor('#FFF3E0' if i % 2 == 0 else 'white')
-        plt.subplots_adjust(left=0.1, right=0.9, top=0.85, bottom=0.1); canvas_sens_tabla = FigureCanvasTkAgg(fig_sens, resumen_frame); canvas_sens_tabla.draw(); canvas_sens_tabla.get_tk_widget().pack(fill=tk.BOTH, expand=True, pady=5)
+        columnas_sens = ["Variación", etiqueta, "Cajas Óptimas", "Costo Óptimo"]; datos_sens = [[f"{r['variacion']:+g}%", f"{r['valor']:.2f}", f"{r['optimo']['num_cajas']}", f"${r['optimo']['costo_total']:.2f}"] for r in resultados_sensibilidad]
+        filas_sens = [(textos, [r["variacion"], r["valor"], r["optimo"]["num_cajas"], r["optimo"]["costo_total"]]) for textos, r in zip(datos_sens, resultados_sensibilidad)]
+        base = [i for i, r in enumerate(resultados_sensibilidad) if r["variacion"] == 0]
+        crear_grilla(resumen_frame, columnas_sens, filas_sens, base, color_encabezado="#FF9800").pack(fill=tk.BOTH, expand=True, pady=5)
         self.sensibilidad_ejecutada = True; self.resultados_sensibilidad = resultados_sensibilidad; parent_frame.update_idletasks(); canvas_parent.configure(scrollregion=canvas_parent.bbox("all"))
 
-    def crear_pestana_regla(self, notebook):
-        frame = tk.Frame(notebook, bg="white")
-        notebook.add(frame, text="📜 Regla de Apertura")
+    def crear_pestana_regla(self, frame):
 
         # Canvas con scrollbar
         canvas_scroll = tk.Canvas(frame, bg="white")
@@ -697,7 +1039,7 @@ TRADE-OFF COSTO-SERVICIO:
 
 EVIDENCIA DE SIMULACIÓN:
 
-• Basado en {self.config['num_replicas']} réplicas independientes
+• Basado en {optimo['num_replicas']} réplicas independientes
 • Desviación estándar: ±${optimo['desv_est']:.2f} USD
 • Intervalo de confianza (95%): ${optimo['costos']['costo_total'] - 1.96*optimo['desv_est']:.2f} - ${optimo['costos']['costo_total'] + 1.96*optimo['desv_est']:.2f} USD
         """
@@ -767,11 +1109,9 @@ PASOS PARA IMPLEMENTAR LA REGLA:
             canvas_scroll.yview_scroll(int(-1*(event.delta/120)), "units")
         canvas_scroll.bind_all("<MouseWheel>", _on_mousewheel_regla)
 
-    def crear_pestana_conclusiones(self, notebook):
+    def crear_pestana_conclusiones(self, frame):
         
         """Crea la pestaña de conclusiones y recomendaciones."""
-        frame = tk.Frame(notebook, bg="white")
-        notebook.add(frame, text="📝 Conclusiones")
 
         canvas_concl = tk.Canvas(frame, bg="white")
         scrollbar_concl = tk.Scrollbar(frame, orient="vertical", command=canvas_concl.yview)
@@ -826,7 +1166,7 @@ PASOS PARA IMPLEMENTAR LA REGLA:
    • Clientes atendidos: {optimo['metricas']['num_clientes']:.0f} por período
 
 4. ROBUSTEZ Y CONFIABILIDAD
-   • Basado en {self.config['num_replicas']} réplicas independientes
+   • Basado en {optimo['num_replicas']} réplicas independientes
    • Desviación estándar: ±${optimo['desv_est']:.2f} USD
    • La solución es robusta ante variaciones de ±20% en llegadas
    • Alta confianza estadística en los resultados
@@ -1189,7 +1529,7 @@ Métricas Clave:
 
 4. ROBUSTEZ Y CONFIABILIDAD
    ─────────────────────────
-   • Basado en {self.config['num_replicas']} réplicas independientes
+   • Basado en {optimo['num_replicas']} réplicas independientes
    • Desviación estándar: ±${optimo['desv_est']:.2f} USD
    • Solución robusta ante variaciones de ±20% en tasa de llegadas
    • Alta confianza estadística en los resultados
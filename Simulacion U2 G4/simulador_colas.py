@@ -1,54 +1,184 @@
 """Lógica de simulación del sistema de colas."""
 
+import copy
+import heapq
 import math
 import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 from cliente import Cliente
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Motores disponibles (clave "motor" de la configuración)
+MOTOR_PYTHON = "python"
+MOTOR_NUMPY = "numpy"
+
+# Campos de la configuración que determinan el resultado de una réplica (con su
+# valor por defecto); los costos no influyen, así que cambiarlos no obliga a re-simular
+CAMPOS_SIMULACION = {
+    "lambda_llegadas": None, "tiempo_simulacion": None,
+    "articulos_min": None, "articulos_max": None,
+    "t_scan_normal": None, "t_cobro_min": None, "t_cobro_max": None,
+    "umbral_tiempo": None, "semilla": 0, "motor": MOTOR_PYTHON,
+}
+
+
+class DespachadorFifo:
+    """Asigna las llegadas (en orden) a la caja que quede libre primero.
+
+    Las cajas se mantienen en un heap de tuplas (tiempo_libre, índice), por lo que
+    cada llegada cuesta O(log s); ante empates gana la caja de menor índice.
+    """
+
+    def __init__(self, num_cajas):
+        self.cajas = [(0.0, i) for i in range(num_cajas)]  # Lista ordenada: ya es un heap válido
+
+    def asignar(self, tiempo_llegada, tiempo_servicio):
+        """Ocupa la próxima caja libre y retorna el tiempo de inicio de servicio."""
+        tiempo_disponible, caja_disponible = self.cajas[0]
+        inicio = max(tiempo_llegada, tiempo_disponible)
+        heapq.heapreplace(self.cajas, (inicio + tiempo_servicio, caja_disponible))
+        return inicio
+
+
+def despachar_fifo(llegadas, servicios, num_cajas):
+    """Retorna los tiempos de inicio de servicio de todas las llegadas (ver DespachadorFifo)."""
+    asignar = DespachadorFifo(num_cajas).asignar
+    return [asignar(tiempo_llegada, tiempo_servicio) for tiempo_llegada, tiempo_servicio in zip(llegadas, servicios)]
+
+
+def crear_generador(config, replica):
+    """Crea el generador de números aleatorios propio de una réplica.
+
+    Esquema de semillas: cada réplica deriva su flujo de la semilla base
+    config["semilla"] (0 por defecto) y de su índice, sin tocar el estado global.
+    - Motor "numpy": SeedSequence(semilla, spawn_key=(replica,)), idéntico al
+      hijo número `replica` de SeedSequence(semilla).spawn(...). SeedSequence
+      mezcla la entropía para que los flujos PCG64 de distintas réplicas no se
+      solapen en la práctica.
+    - Motor "python": random.Random("semilla:replica"); la cadena se convierte
+      en una semilla de 512 bits vía SHA-512, así cada réplica arranca en un
+      punto independiente del período 2**19937 - 1 de Mersenne Twister.
+    La misma (semilla, réplica) produce siempre el mismo flujo, sin importar el
+    proceso u orden en que se ejecute.
+    """
+    semilla = config.get("semilla", 0)
+    if config.get("motor", MOTOR_PYTHON) == MOTOR_NUMPY:
+        if np is None:
+            raise ImportError("El motor 'numpy' requiere la librería numpy (pip install numpy).")
+        return np.random.default_rng(np.random.SeedSequence(semilla, spawn_key=(replica,)))
+    return random.Random(f"{semilla}:{replica}")
+
+
+def clave_replica(config, num_cajas, replica):
+    """Identifica el resultado de una réplica: campos de simulación, cajas e índice."""
+    campos = tuple(config.get(campo, defecto) for campo, defecto in CAMPOS_SIMULACION.items())
+    return campos + (num_cajas, replica)
+
+
+def simular_replica(config, num_cajas, replica):
+    """Ejecuta una réplica con su propio generador (ver crear_generador).
+
+    Es una función de módulo para poder enviarla a procesos hijos; la ruta
+    serial y la paralela la usan por igual, así que los resultados coinciden.
+    """
+    return SimuladorColas(config).simular_una_cola(num_cajas, crear_generador(config, replica))
+
+
+def simular_replica_comun(config, lista_cajas, replica):
+    """Simula una réplica para varios números de cajas con una sola demanda generada.
+
+    La demanda (llegadas y servicios) se genera una sola vez y se reutiliza
+    para cada valor de lista_cajas, así todas las configuraciones enfrentan
+    exactamente los mismos clientes. Retorna {num_cajas: métricas}.
+    """
+    simulador = SimuladorColas(config)
+    llegadas, servicios, clientes = simulador.generar_demanda(crear_generador(config, replica))
+
+    resultados = {}
+    for num_cajas in lista_cajas:
+        # Cada configuración necesita sus propios Cliente (solo si se conservan)
+        clientes_config = [copy.copy(c) for c in clientes] if clientes else None
+        resultados[num_cajas] = simulador.simular_demanda(num_cajas, llegadas, servicios, clientes_config)
+    return resultados
+
 
 class SimuladorColas:
     """Simulador de sistema de colas M/M/s."""
 
     def __init__(self, config):
         self.config = config
+        self.motor = config.get("motor", MOTOR_PYTHON)
+        if self.motor not in (MOTOR_PYTHON, MOTOR_NUMPY):
+            raise ValueError(f"Motor de simulación desconocido: {self.motor}")
+        if self.motor == MOTOR_NUMPY and np is None:
+            raise ImportError("El motor 'numpy' requiere la librería numpy (pip install numpy).")
 
-    def generar_llegadas_poisson(self, lambda_llegadas, tiempo_total):
+    def generar_llegadas_poisson(self, lambda_llegadas, tiempo_total, rng=random):
         """Genera tiempos de llegada según proceso de Poisson."""
         llegadas = []
         tiempo = 0
 
         while tiempo < tiempo_total:
             # Tiempo entre llegadas: exponencial
-            tiempo_entre = -math.log(random.random()) / lambda_llegadas
+            tiempo_entre = -math.log(rng.random()) / lambda_llegadas
             tiempo += tiempo_entre
             if tiempo < tiempo_total:
                 llegadas.append(tiempo)
 
         return llegadas
 
-    def simular_replicas(self, num_cajas, num_replicas=20):
-        """Ejecuta múltiples réplicas de la simulación."""
-        resultados = []
+    def simular_replicas(self, num_cajas, num_replicas=20, num_workers=None):
+        """Ejecuta múltiples réplicas de la simulación.
 
-        for replica in range(num_replicas):
-            random.seed(replica * 1000)
-            resultado = self.simular_una_cola(num_cajas)
-            resultados.append(resultado)
+        Con num_workers > 1 (por defecto config["num_workers"]) las réplicas se
+        reparten en un ProcessPoolExecutor; el resultado sigue en orden de réplica.
+        """
+        if num_workers is None:
+            num_workers = self.config.get("num_workers", 1)
 
-        return resultados
+        if num_workers <= 1 or num_replicas <= 1:
+            return [simular_replica(self.config, num_cajas, replica) for replica in range(num_replicas)]
 
-    def simular_una_cola(self, num_cajas):
-        """Simula una cola M/M/s."""
-        lambda_llegadas = self.config["lambda_llegadas"]
-        tiempo_simulacion = self.config["tiempo_simulacion"]
+        with ProcessPoolExecutor(max_workers=min(num_workers, num_replicas)) as executor:
+            return list(executor.map(simular_replica, repeat(self.config), repeat(num_cajas), range(num_replicas)))
+
+    def simular_una_cola(self, num_cajas, rng=None):
+        """Simula una cola M/M/s con el motor indicado en config["motor"].
+
+        rng es el generador de la réplica (random.Random o numpy Generator según
+        el motor); si no se indica se usa uno nuevo sin semilla.
+        """
+        return self.simular_demanda(num_cajas, *self.generar_demanda(rng))
 
-        tiempos_llegada = self.generar_llegadas_poisson(lambda_llegadas, tiempo_simulacion)
+    def generar_demanda(self, rng=None):
+        """Sortea las llegadas y los tiempos de servicio (min) de una réplica.
 
-        clientes = []
-        cajas = [0.0] * num_cajas  # Tiempo en que cada caja estará libre
+        La demanda no depende del número de cajas, por lo que puede reutilizarse
+        entre configuraciones. Retorna (llegadas, servicios, clientes), donde
+        clientes es la lista de Cliente solo si config["conservar_clientes"] lo
+        pide con el motor en Python (None en otro caso).
+        """
+        if self.motor == MOTOR_NUMPY:
+            return self.generar_demanda_numpy(rng)
+        if rng is None:
+            rng = random.Random()
 
-        for tiempo_llegada in tiempos_llegada:
-            articulos = random.randint(self.config["articulos_min"], self.config["articulos_max"])
+        llegadas = self.generar_llegadas_poisson(self.config["lambda_llegadas"], self.config["tiempo_simulacion"], rng)
+
+        # Cada Cliente se descarta apenas se sortea su servicio, salvo que se
+        # pida conservarlos (modo streaming en caso contrario)
+        conservar_clientes = self.config.get("conservar_clientes", True)
+        clientes = [] if conservar_clientes else None
+        servicios = []
+
+        for tiempo_llegada in llegadas:
+            articulos = rng.randint(self.config["articulos_min"], self.config["articulos_max"])
 
             cliente = Cliente(
                 tiempo_llegada,
@@ -56,45 +186,129 @@ class SimuladorColas:
                 self.config["t_scan_normal"],
                 self.config["t_cobro_min"],
                 self.config["t_cobro_max"],
+                rng,
             )
+            servicios.append(cliente.tiempo_servicio)
+
+            if conservar_clientes:
+                clientes.append(cliente)
 
-            caja_disponible = min(range(num_cajas), key=lambda i: cajas[i])
-            tiempo_disponible = cajas[caja_disponible]
+        return llegadas, servicios, clientes
 
-            cliente.tiempo_inicio_servicio = max(tiempo_llegada, tiempo_disponible)
-            cliente.tiempo_fin_servicio = cliente.tiempo_inicio_servicio + cliente.tiempo_servicio
-            cliente.tiempo_espera = cliente.tiempo_inicio_servicio - tiempo_llegada
-            cliente.tiempo_sistema = cliente.tiempo_fin_servicio - tiempo_llegada
+    def generar_demanda_numpy(self, rng=None):
+        """Genera llegadas y servicios en bloque con NumPy (sin objetos Cliente)."""
+        if rng is None:
+            rng = np.random.default_rng()
+        lambda_llegadas = self.config["lambda_llegadas"]
+        tiempo_simulacion = self.config["tiempo_simulacion"]
+
+        # Llegadas: suma acumulada de tiempos exponenciales, con margen de ~5 desviaciones
+        esperado = lambda_llegadas * tiempo_simulacion
+        bloque = int(esperado + 5 * math.sqrt(esperado) + 10)
+        llegadas = np.cumsum(rng.exponential(1 / lambda_llegadas, bloque))
+        while llegadas[-1] < tiempo_simulacion:
+            extra = llegadas[-1] + np.cumsum(rng.exponential(1 / lambda_llegadas, bloque))
+            llegadas = np.concatenate((llegadas, extra))
+        llegadas = llegadas[llegadas < tiempo_simulacion]
 
-            cajas[caja_disponible] = cliente.tiempo_fin_servicio
+        n = len(llegadas)
+        articulos = rng.integers(self.config["articulos_min"], self.config["articulos_max"] + 1, n)
+        cobro = rng.uniform(self.config["t_cobro_min"], self.config["t_cobro_max"], n)
+        servicios = (articulos * self.config["t_scan_normal"] + cobro) / 60
 
-            clientes.append(cliente)
+        return llegadas, servicios, None
 
-        if not clientes:
-            return {
-                "num_clientes": 0,
-                "tiempo_sistema_prom": 0,
-                "tiempo_espera_prom": 0,
-                "porcentaje_sla": 100,
-                "utilizacion": 0,
-                "clientes": [],
-            }
+    def simular_demanda(self, num_cajas, llegadas, servicios, clientes=None):
+        """Atiende una demanda ya generada con num_cajas cajas y calcula las métricas.
 
-        tiempo_sistema_prom = sum(c.tiempo_sistema for c in clientes) / len(clientes)
-        tiempo_espera_prom = sum(c.tiempo_espera for c in clientes) / len(clientes)
+        Si se pasan los Cliente de la demanda, se completan sus tiempos y se
+        devuelven en "clientes".
+        """
+        if self.motor == MOTOR_NUMPY:
+            return self.simular_demanda_numpy(num_cajas, llegadas, servicios)
+
+        if not llegadas:
+            return self._metricas_vacias()
 
         umbral_tiempo = self.config["umbral_tiempo"]
-        clientes_cumplen_sla = sum(1 for c in clientes if c.tiempo_sistema <= umbral_tiempo)
-        porcentaje_sla = (clientes_cumplen_sla / len(clientes)) * 100
+        despachador = DespachadorFifo(num_cajas)
+
+        num_clientes = 0
+        suma_tiempo_sistema = 0
+        suma_tiempo_espera = 0
+        clientes_cumplen_sla = 0
+        tiempo_servicio_total = 0
+
+        for tiempo_llegada, tiempo_servicio in zip(llegadas, servicios):
+            inicio = despachador.asignar(tiempo_llegada, tiempo_servicio)
+            fin = inicio + tiempo_servicio
+            tiempo_espera = inicio - tiempo_llegada
+            tiempo_sistema = fin - tiempo_llegada
 
-        tiempo_servicio_total = sum(c.tiempo_servicio for c in clientes)
-        utilizacion = (tiempo_servicio_total / (num_cajas * tiempo_simulacion)) * 100
+            if clientes:
+                cliente = clientes[num_clientes]
+                cliente.tiempo_inicio_servicio = inicio
+                cliente.tiempo_fin_servicio = fin
+                cliente.tiempo_espera = tiempo_espera
+                cliente.tiempo_sistema = tiempo_sistema
+
+            num_clientes += 1
+            suma_tiempo_sistema += tiempo_sistema
+            suma_tiempo_espera += tiempo_espera
+            if tiempo_sistema <= umbral_tiempo:
+                clientes_cumplen_sla += 1
+            tiempo_servicio_total += tiempo_servicio
+
+        return {
+            "num_clientes": num_clientes,
+            "tiempo_sistema_prom": suma_tiempo_sistema / num_clientes,
+            "tiempo_espera_prom": suma_tiempo_espera / num_clientes,
+            "porcentaje_sla": (clientes_cumplen_sla / num_clientes) * 100,
+            "utilizacion": (tiempo_servicio_total / (num_cajas * self.config["tiempo_simulacion"])) * 100,
+            "clientes": clientes or [],
+        }
+
+    def simular_demanda_numpy(self, num_cajas, llegadas, servicios):
+        """Calcula esperas y tiempos en sistema con operaciones sobre arreglos.
+
+        Devuelve el mismo diccionario de métricas que el motor en Python puro,
+        pero sin construir objetos Cliente ("clientes" queda vacío).
+        """
+        n = len(llegadas)
+        if n == 0:
+            return self._metricas_vacias()
+
+        if num_cajas == 1:
+            # Recursión de Lindley resuelta en forma cerrada:
+            # fin_n = C_n + max_{k<=n}(A_k - C_{k-1}), con C_n = suma de servicios
+            acumulado = np.cumsum(servicios)
+            holgura = llegadas - (acumulado - servicios)
+            fin = acumulado + np.maximum.accumulate(holgura)
+            inicio = fin - servicios
+        else:
+            inicio = np.array(despachar_fifo(llegadas.tolist(), servicios.tolist(), num_cajas))
+            fin = inicio + servicios
+
+        tiempos_espera = inicio - llegadas
+        tiempos_sistema = fin - llegadas
+
+        return {
+            "num_clientes": n,
+            "tiempo_sistema_prom": float(tiempos_sistema.mean()),
+            "tiempo_espera_prom": float(tiempos_espera.mean()),
+            "porcentaje_sla": float(np.count_nonzero(tiempos_sistema <= self.config["umbral_tiempo"]) / n * 100),
+            "utilizacion": float(servicios.sum() / (num_cajas * self.config["tiempo_simulacion"]) * 100),
+            "clientes": [],
+        }
 
+    @staticmethod
+    def _metricas_vacias():
+        """Métricas de una réplica sin llegadas."""
         return {
-            "num_clientes": len(clientes),
-            "tiempo_sistema_prom": tiempo_sistema_prom,
-            "tiempo_espera_prom": tiempo_espera_prom,
-            "porcentaje_sla": porcentaje_sla,
-            "utilizacion": utilizacion,
-            "clientes": clientes,
+            "num_clientes": 0,
+            "tiempo_sistema_prom": 0,
+            "tiempo_espera_prom": 0,
+            "porcentaje_sla": 100,
+            "utilizacion": 0,
+            "clientes": [],
         }
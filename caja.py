@@ -3,7 +3,10 @@ Módulo que define la clase Caja.
 Representa una caja de cobro con su fila de clientes.
 """
 
+import math
 import random
+from collections import deque
+from itertools import islice
 from cliente import Cliente
 from config import (
     ARTICULOS_MIN, ARTICULOS_MAX_NORMAL, ARTICULOS_MAX_EXPRESS,
@@ -11,6 +14,19 @@ from config import (
 )
 
 
+# Separación vertical entre clientes consecutivos de la fila (px)
+SEPARACION_FILA = 35
+
+# Ancho ocupado a la derecha de la caja por el contador "Fila: N" (px)
+ANCHO_CONTADOR = 100
+
+# Partes de la caja que pueden cambiar entre cuadros (ver Caja.actualizar)
+CAMBIO_TIEMPO = "tiempo"      # Cambió el texto del tiempo restante
+CAMBIO_CLIENTE = "cliente"    # Terminó o empezó la atención de un cliente
+CAMBIO_FILA = "fila"          # La fila avanzó o llegaron clientes
+CAMBIO_VISTA = "vista"        # Cambió la región visible del canvas o el zoom
+
+
 class Caja:
     """Representa una caja de cobro y su fila."""
     
@@ -34,12 +50,34 @@ class Caja:
         self.color = color
         self.config = config
 
-        self.fila_clientes = []
+        self.fila_clientes = deque()
+        self.trabajo_en_fila = 0.0  # Suma de tiempos de atención de la fila, mantenida al agregar/sacar
+        self.articulos_en_fila = 0  # Suma de artículos de la fila, para el resumen "+N más"
         self.cliente_actual = None
         self.tiempo_restante_cliente = 0.0
         self.tiempo_total_estatico = 0.0
+
+        # Reloj de la simulación (segundos simulados) y fin programado de la atención actual
+        self.reloj = 0.0
+        self.fin_atencion = 0.0
+        self.tiempo_vaciado = None  # Instante en que la caja atendió a su último cliente
         self.personas_iniciales = 0
 
+        # Región de la pantalla (sin escalar) donde se dibuja la fila: hasta limite_fila
+        # (lo fija el layout para no pisar la fila de cajas de abajo) y dentro de la vista
+        self.limite_fila = float('inf')
+        self.vista = (float('-inf'), float('inf'))
+        self.vista_x = (float('-inf'), float('inf'))
+        self.escala = 1.0
+
+        # Escena retenida: ids de los items del canvas, creados una sola vez en dibujar()
+        self.items = None
+        self.items_lugares = {}  # Lugar (0 = en la caja, k = k-ésimo en fila) -> (óvalo, texto)
+
+        # Cambios acumulados desde el último dibujo (al inicio hay que dibujar todo)
+        self.cambios = {CAMBIO_TIEMPO, CAMBIO_CLIENTE, CAMBIO_FILA}
+        self.texto_tiempo = ""
+
     def agregar_clientes_iniciales(self, cantidad):
         """
         Añade la cantidad inicial de clientes a la fila.
@@ -58,18 +96,40 @@ class Caja:
                 self.config['t_cobro_min'],
                 self.config['t_cobro_max']
             )
-            self.fila_clientes.append(cliente)
+            self.agregar_cliente(cliente)
+
+    def agregar_cliente(self, cliente):
+        """
+        Agrega un cliente al final de la fila.
+
+        Args:
+            cliente: Objeto Cliente.
+        """
+        self.fila_clientes.append(cliente)
+        self.trabajo_en_fila += cliente.get_tiempo_atencion()
+        self.articulos_en_fila += cliente.articulos
+        self.cambios.add(CAMBIO_FILA)
+
+    def sacar_cliente(self):
+        """Saca al primer cliente de la fila (O(1)) y lo retorna."""
+        cliente = self.fila_clientes.popleft()
+        # Con la fila vacía se vuelve a 0 exacto para no acumular error de redondeo
+        self.trabajo_en_fila = self.trabajo_en_fila - cliente.get_tiempo_atencion() if self.fila_clientes else 0.0
+        self.articulos_en_fila -= cliente.articulos
+        return cliente
 
     def calcular_tiempo_total_estatico(self):
         """
         Calcula el tiempo total necesario para atender a toda la fila.
+
+        Es O(1): el total se mantiene al agregar y sacar clientes.
         
         Returns:
             Tiempo total en segundos.
         """
         if not self.fila_clientes:
             return 0.0
-        self.tiempo_total_estatico = sum(c.get_tiempo_atencion() for c in self.fila_clientes)
+        self.tiempo_total_estatico = self.trabajo_en_fila
         return self.tiempo_total_estatico
 
     def actualizar(self, dt):
@@ -78,86 +138,250 @@ class Caja:
         
         Args:
             dt: Delta time desde la última actualización.
+
+        Returns:
+            Conjunto con las partes que cambiaron (ver avanzar_hasta).
         """
-        if self.cliente_actual:
-            self.tiempo_restante_cliente -= dt * VELOCIDAD_SIMULACION
-            if self.tiempo_restante_cliente <= 0:
-                self.cliente_actual = None
-        
+        return self.avanzar_hasta(self.reloj + dt * VELOCIDAD_SIMULACION)
+
+    def avanzar_hasta(self, instante):
+        """
+        Lleva la caja al instante simulado indicado, atendiendo a todos los
+        clientes que terminan antes.
+
+        Cada atención empieza exactamente cuando termina la anterior (no en el
+        cuadro siguiente), así que la caja se vacía en el instante
+        tiempo_total_estatico sin importar cómo se divida el avance.
+
+        Args:
+            instante: Tiempo simulado (segundos) al que se avanza.
+
+        Returns:
+            Conjunto con las partes que cambiaron (CAMBIO_TIEMPO, CAMBIO_CLIENTE,
+            CAMBIO_FILA); vacío si nada visible cambió. También se acumulan en
+            self.cambios hasta el próximo dibujar().
+        """
+        cambios = set()
         if not self.cliente_actual and self.fila_clientes:
-            self.cliente_actual = self.fila_clientes.pop(0)
-            self.tiempo_restante_cliente = self.cliente_actual.get_tiempo_atencion()
+            # Caja libre con fila: el siguiente cliente empieza en el reloj actual
+            self.cliente_actual = self.sacar_cliente()
+            self.fin_atencion = self.reloj + self.cliente_actual.get_tiempo_atencion()
+            cambios.update((CAMBIO_CLIENTE, CAMBIO_FILA))
+
+        while self.cliente_actual and self.fin_atencion <= instante:
+            # El siguiente cliente empieza justo cuando termina el actual
+            if self.fila_clientes:
+                self.cliente_actual = self.sacar_cliente()
+                self.fin_atencion += self.cliente_actual.get_tiempo_atencion()
+                cambios.add(CAMBIO_FILA)
+            else:
+                self.cliente_actual = None
+                self.tiempo_vaciado = self.fin_atencion
+            cambios.add(CAMBIO_CLIENTE)
+
+        self.reloj = max(self.reloj, instante)
+        self.tiempo_restante_cliente = self.fin_atencion - self.reloj if self.cliente_actual else 0.0
+
+        if self.cliente_actual:
+            texto_tiempo = f"{self.tiempo_restante_cliente / VELOCIDAD_SIMULACION:.1f}s"
+        elif self.tiempo_vaciado is not None:
+            texto_tiempo = f"Vaciada: {self.tiempo_vaciado:.2f}s"
+        else:
+            texto_tiempo = ""
+        if texto_tiempo != self.texto_tiempo:
+            self.texto_tiempo = texto_tiempo
+            cambios.add(CAMBIO_TIEMPO)
+
+        self.cambios |= cambios
+        return cambios
+
+    def tiempo_hasta_cambio(self):
+        """
+        Segundos reales hasta el próximo cambio visible de la caja, a velocidad 1x.
+
+        El tiempo mostrado baja un segundo por segundo real y se redondea a
+        décimas, así que el texto cambia al bajar media décima por debajo del
+        valor mostrado (o cuando termina el cliente).
+
+        Returns:
+            Segundos hasta el cambio, o None si la caja está vacía.
+        """
+        if not self.cliente_actual:
+            return None
+        mostrado = self.tiempo_restante_cliente / VELOCIDAD_SIMULACION
+        limite = round(mostrado, 1) - 0.05
+        return max(0.0, min(mostrado, mostrado - limite))
+
+    def posicion_cliente(self, indice):
+        """
+        Centro del cliente en la posición indicada (0 = en la caja, 1 = primero en fila).
+
+        Args:
+            indice: Posición del cliente.
+
+        Returns:
+            Tupla (x, y) sin escalar.
+        """
+        return self.x + self.ancho // 2, self.y + self.alto + 30 + indice * SEPARACION_FILA
+
+    def cambiar_vista(self, x_min, x_max, y_min, y_max, escala):
+        """
+        Actualiza la región visible (en coordenadas sin escalar) y el zoom.
+
+        Args:
+            x_min, x_max: Límites horizontales visibles del canvas.
+            y_min, y_max: Límites verticales visibles del canvas.
+            escala: Factor de zoom con el que se dibuja.
+        """
+        if escala != self.escala:
+            self.escala = escala
+            self.reiniciar_escena()
+        if (y_min, y_max) != self.vista or (x_min, x_max) != self.vista_x:
+            self.vista = (y_min, y_max)
+            self.vista_x = (x_min, x_max)
+            self.cambios.add(CAMBIO_VISTA)
+
+    def columna_visible(self):
+        """True si la columna de la caja (caja, contador y fila) se cruza con la vista horizontal."""
+        return self.x <= self.vista_x[1] and self.x + self.ancho + ANCHO_CONTADOR >= self.vista_x[0]
+
+    def reiniciar_escena(self):
+        """Olvida los items dibujados (p. ej. tras borrar el canvas); el próximo dibujar() crea todo de nuevo."""
+        self.items = None
+        self.items_lugares = {}
+        self.cambios.update((CAMBIO_TIEMPO, CAMBIO_CLIENTE, CAMBIO_FILA, CAMBIO_VISTA))
+
+    def visible(self):
+        """True si alguna parte de la caja o de su fila (hasta limite_fila) entra en la vista."""
+        return self.columna_visible() and self.y <= self.vista[1] and self.limite_fila >= self.vista[0]
+
+    def lugares_visibles(self):
+        """
+        Lugares de la fila que entran en la vista.
+
+        Returns:
+            Tupla (primero, ultimo): rango de lugares a dibujar (vacío si
+            primero > ultimo o si la columna queda fuera de la vista
+            horizontal). Los lugares van de 0 (en la caja) a la cantidad de
+            personas en fila.
+        """
+        if not self.columna_visible():
+            return 1, 0
+        n = len(self.fila_clientes)
+        _, y_caja = self.posicion_cliente(0)
+        # Se acota la región a la fila completa para no operar con infinitos
+        y_min = max(self.vista[0], y_caja - 12)
+        y_max = min(self.vista[1], self.limite_fila, y_caja + 12 + n * SEPARACION_FILA)
+        primero = math.ceil((y_min - y_caja + 12) / SEPARACION_FILA)
+        ultimo = math.floor((y_max - y_caja - 12) / SEPARACION_FILA)
+        return primero, ultimo
+
+    def _escalar(self, *coordenadas):
+        return [c * self.escala for c in coordenadas]
+
+    def _fuente(self, tamano, *estilo):
+        return ("Arial", max(6, round(tamano * self.escala)), *estilo)
 
     def dibujar(self, canvas):
         """
-        Dibuja la caja y su fila en el canvas de Tkinter.
-        
+        Dibuja la caja y su fila en el canvas de Tkinter (escena retenida).
+
+        La primera llamada crea los items fijos de la caja; las siguientes solo
+        actualizan textos con itemconfig. De la fila solo se dibujan los
+        lugares que entran en la vista (y antes de limite_fila); si no entra
+        completa, el último lugar visible muestra un resumen "+N más" con el
+        total de artículos del resto, así el costo por cuadro no depende del
+        largo de la fila. Una columna fuera de la vista horizontal no crea
+        items (ni los de la caja): sus cambios quedan pendientes hasta que
+        entre en la vista. Solo se tocan las partes marcadas en self.cambios;
+        si no hay cambios pendientes no se hace nada.
+
         Args:
             canvas: Canvas de Tkinter donde dibujar.
         """
-        # Dibujar rectángulo de la caja
-        canvas.create_rectangle(
-            self.x, self.y, self.x + self.ancho, self.y + self.alto,
-            fill=self.color, outline="#333333", width=2, tags="caja"
-        )
-        
-        # Nombre de la caja
-        canvas.create_text(
-            self.x + self.ancho // 2, self.y + 20,
-            text=self.nombre, fill="white", 
-            font=("Arial", 12, "bold"), tags="caja"
-        )
-
-        # Tiempo restante del cliente actual
-        if self.cliente_actual:
-            tiempo_display = f"{self.tiempo_restante_cliente / VELOCIDAD_SIMULACION:.1f}s"
-            canvas.create_text(
-                self.x + self.ancho // 2, self.y + 45,
-                text=tiempo_display, fill="white", 
-                font=("Arial", 10), tags="caja"
-            )
-            
-            # Cliente en la caja (círculo)
-            pos_cliente_x = self.x + self.ancho // 2
-            pos_cliente_y = self.y + self.alto + 30
-            canvas.create_oval(
-                pos_cliente_x - 12, pos_cliente_y - 12,
-                pos_cliente_x + 12, pos_cliente_y + 12,
-                fill=COLOR_PERSONA, outline="#000000", tags="caja"
-            )
-            
-            # Artículos del cliente actual
-            canvas.create_text(
-                pos_cliente_x + 30, pos_cliente_y,
-                text=f"{self.cliente_actual.articulos} art.",
-                fill=COLOR_TEXTO, font=("Arial", 9), tags="caja"
-            )
+        if self.items is None:
+            if not self.columna_visible():
+                return
+            self.items = {
+                "caja": canvas.create_rectangle(
+                    *self._escalar(self.x, self.y, self.x + self.ancho, self.y + self.alto),
+                    fill=self.color, outline="#333333", width=2, tags="caja"
+                ),
+                "nombre": canvas.create_text(
+                    *self._escalar(self.x + self.ancho // 2, self.y + 20),
+                    text=self.nombre, fill="white",
+                    font=self._fuente(12, "bold"), tags="caja"
+                ),
+                "tiempo": canvas.create_text(
+                    *self._escalar(self.x + self.ancho // 2, self.y + 45),
+                    text="", fill="white",
+                    font=self._fuente(10), tags="caja"
+                ),
+                "fila": canvas.create_text(
+                    *self._escalar(self.x + self.ancho + 60, self.y + 40),
+                    text="", fill=COLOR_TEXTO, font=self._fuente(11, "bold"), tags="caja"
+                ),
+                "resto": canvas.create_text(
+                    0, 0, text="", anchor="w", fill=COLOR_TEXTO,
+                    font=self._fuente(9, "bold"), state="hidden", tags="caja"
+                ),
+            }
 
-        # Dibujar fila de clientes
-        for i, cliente in enumerate(self.fila_clientes):
-            pos_x = self.x + self.ancho // 2
-            pos_y = self.y + self.alto + 30 + ((i + 1) * 35)
-            
-            # Círculo del cliente
-            canvas.create_oval(
-                pos_x - 12, pos_y - 12,
-                pos_x + 12, pos_y + 12,
-                fill=COLOR_PERSONA, outline="#000000", tags="caja"
-            )
-            
-            # Artículos del cliente
-            canvas.create_text(
-                pos_x + 30, pos_y,
-                text=f"{cliente.articulos} art.",
-                fill=COLOR_TEXTO, font=("Arial", 9), tags="caja"
-            )
+        if not self.cambios:
+            return
+
+        if self.cambios & {CAMBIO_CLIENTE, CAMBIO_FILA, CAMBIO_VISTA}:
+            self.dibujar_fila(canvas)
+
+        # Tiempo restante del cliente actual y número de personas en fila
+        if CAMBIO_TIEMPO in self.cambios:
+            canvas.itemconfig(self.items["tiempo"], text=self.texto_tiempo)
+        if CAMBIO_FILA in self.cambios:
+            canvas.itemconfig(self.items["fila"], text=f"Fila: {len(self.fila_clientes)}")
+        self.cambios.clear()
+
+    def dibujar_fila(self, canvas):
+        """Actualiza los lugares visibles de la fila y el resumen del resto (O(lugares visibles))."""
+        primero, ultimo = self.lugares_visibles()
+        n = len(self.fila_clientes)
+        resto = 1 <= ultimo < n  # La fila no entra: el último lugar visible resume a los demás
+        ultimo_cliente = ultimo - 1 if resto else ultimo
+
+        # Clientes de los lugares visibles (el lugar 0 es el que está en la caja)
+        clientes = {}
+        if primero == 0 and self.cliente_actual and ultimo >= 0:
+            clientes[0] = self.cliente_actual
+        desde = max(primero, 1)
+        for lugar, cliente in enumerate(islice(self.fila_clientes, desde - 1, max(desde - 1, ultimo_cliente)), start=desde):
+            clientes[lugar] = cliente
+
+        # Lugares que dejaron de verse u ocuparse; se crean los que faltan y se actualiza el texto del resto
+        for lugar in [l for l in self.items_lugares if l not in clientes]:
+            canvas.delete(*self.items_lugares.pop(lugar))
+        for lugar, cliente in clientes.items():
+            items = self.items_lugares.get(lugar)
+            if items is None:
+                pos_x, pos_y = self.posicion_cliente(lugar)
+                items = self.items_lugares[lugar] = (
+                    canvas.create_oval(
+                        *self._escalar(pos_x - 12, pos_y - 12, pos_x + 12, pos_y + 12),
+                        fill=COLOR_PERSONA, outline="#000000", tags="caja"
+                    ),
+                    canvas.create_text(
+                        *self._escalar(pos_x + 30, pos_y), text="",
+                        fill=COLOR_TEXTO, font=self._fuente(9), tags="caja"
+                    ),
+                )
+            canvas.itemconfig(items[1], text=f"{cliente.articulos} art.")
 
-        # Número de personas en fila
-        canvas.create_text(
-            self.x + self.ancho + 60, self.y + 40,
-            text=f"Fila: {len(self.fila_clientes)}",
-            fill=COLOR_TEXTO, font=("Arial", 11, "bold"), tags="caja"
-        )
+        if resto and ultimo >= primero:
+            # Artículos del resto = total de la fila menos los de los clientes dibujados antes del resumen
+            articulos_resto = self.articulos_en_fila - sum(c.articulos for c in islice(self.fila_clientes, ultimo - 1))
+            pos_x, pos_y = self.posicion_cliente(ultimo)
+            canvas.coords(self.items["resto"], *self._escalar(pos_x - 12, pos_y))
+            canvas.itemconfig(self.items["resto"], text=f"+{n - ultimo + 1} más ({articulos_resto} art.)", state="normal")
+        else:
+            canvas.itemconfig(self.items["resto"], state="hidden")
 
     def tiene_clientes(self):
         """Retorna True si la caja aún tiene clientes (en atención o en fila)."""
@@ -26,3 +26,13 @@ ARTICULOS_MAX_EXPRESS = 10
 
 # --- VELOCIDAD DE SIMULACIÓN ---
 VELOCIDAD_SIMULACION = 10.0  # Multiplicador de velocidad
+VELOCIDADES = (0.25, 0.5, 1, 2, 5, 10, 50, 100)  # Opciones de reproducción (× VELOCIDAD_SIMULACION)
+
+# --- FRECUENCIA DE CUADROS (adaptativa) ---
+INTERVALO_MINIMO_MS = 33   # ~30 FPS como máximo
+INTERVALO_MAXIMO_MS = 250  # Espera máxima entre cuadros mientras la simulación corre
+
+# --- ZOOM DEL CANVAS (Ctrl + rueda del mouse) ---
+ZOOM_MINIMO = 0.25
+ZOOM_MAXIMO = 3.0
+PASO_ZOOM = 1.25
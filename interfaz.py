@@ -5,6 +5,7 @@ import random
 
 from config import *
 from caja import Caja
+from motor_eventos import MotorEventos
 from analizador import AnalizadorCajas
 
 
@@ -24,10 +25,18 @@ class SimulacionApp:
         self.root.configure(bg=COLOR_FONDO)
         
         self.cajas = []
+        self.cajas_visibles = []  # Cajas que entran en la vista; solo estas se sincronizan y dibujan en cada cuadro
         self.config = {}
         self.simulacion_corriendo = False
         self.simulacion_terminada = False
         self.ultimo_tiempo = time.time()
+        self.escala = 1.0
+        self.motor = None
+        self.pausado = False
+        self.velocidad = 1.0
+        self.id_tick = None
+        self.ancho_escena = ANCHO_PANTALLA
+        self.alto_escena = ALTO_PANTALLA
         
         self.crear_interfaz_configuracion()
     
@@ -225,6 +234,7 @@ class SimulacionApp:
                 pos_y = top_margin + row * (box_h + pad_y)
 
                 caja = Caja(nombre, pos_x, pos_y, False, COLOR_CAJA, self.config)
+                caja.limite_fila = pos_y + box_h + pad_y - 10  # La fila no pisa la caja de abajo
 
                 cantidad = int(self.entries_filas[idx_entry].get())
                 caja.agregar_clientes_iniciales(cantidad)
@@ -244,6 +254,7 @@ class SimulacionApp:
                 pos_y = top_margin + row * (box_h + pad_y)
 
                 caja = Caja(nombre, pos_x, pos_y, True, COLOR_CAJA_EXPRESS, self.config)
+                caja.limite_fila = pos_y + box_h + pad_y - 10
 
                 cantidad = int(self.entries_filas[idx_entry].get())
                 caja.agregar_clientes_iniciales(cantidad)
@@ -253,6 +264,10 @@ class SimulacionApp:
 
                 idx_entry += 1
                 layout_index += 1
+
+            # Tamaño de la escena completa (sin zoom), para la región de scroll del canvas
+            num_filas = -(-num_total_cajas // columns)
+            self.alto_escena = max(ALTO_PANTALLA, top_margin + num_filas * (box_h + pad_y))
             
             self.mostrar_analisis()
             
@@ -331,13 +346,69 @@ class SimulacionApp:
         )
         self.label_estado.pack(side=tk.RIGHT, padx=10)
         
+        # Controles de reproducción: pausa, paso a paso, velocidad e ir al final
+        frame_reproduccion = tk.Frame(self.root, bg=COLOR_PANEL)
+        frame_reproduccion.pack(fill=tk.X, padx=10)
+        
+        self.btn_pausa = tk.Button(
+            frame_reproduccion, text="⏸ Pausa", font=("Arial", 11), width=12,
+            cursor="hand2", command=self.alternar_pausa
+        )
+        btn_siguiente = tk.Button(
+            frame_reproduccion, text="⏭ Siguiente evento", font=("Arial", 11),
+            cursor="hand2", command=self.siguiente_evento
+        )
+        btn_final = tk.Button(
+            frame_reproduccion, text="⏩ Ir al final", font=("Arial", 11),
+            cursor="hand2", command=self.ir_al_final
+        )
+        self.botones_reproduccion = [self.btn_pausa, btn_siguiente, btn_final]
+        for boton in self.botones_reproduccion:
+            boton.pack(side=tk.LEFT, padx=5, pady=5)
+        
+        tk.Label(frame_reproduccion, text="Velocidad:", font=("Arial", 11), bg=COLOR_PANEL).pack(side=tk.LEFT, padx=(15, 5))
+        combo_velocidad = ttk.Combobox(
+            frame_reproduccion, values=[f"{v:g}x" for v in VELOCIDADES],
+            state="readonly", width=7
+        )
+        combo_velocidad.current(VELOCIDADES.index(1))
+        combo_velocidad.bind("<<ComboboxSelected>>", lambda e: self.cambiar_velocidad(VELOCIDADES[combo_velocidad.current()]))
+        combo_velocidad.pack(side=tk.LEFT)
+        
+        self.label_reloj = tk.Label(frame_reproduccion, text="", font=("Consolas", 11), bg=COLOR_PANEL)
+        self.label_reloj.pack(side=tk.RIGHT, padx=10)
+        
+        frame_canvas = tk.Frame(self.root, bg=COLOR_FONDO)
+        frame_canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        scroll_y = tk.Scrollbar(frame_canvas, orient=tk.VERTICAL)
+        scroll_x = tk.Scrollbar(frame_canvas, orient=tk.HORIZONTAL)
         self.canvas = tk.Canvas(
-            self.root,
+            frame_canvas,
             bg=COLOR_FONDO,
-            highlightthickness=0
+            highlightthickness=0,
+            scrollregion=(0, 0, self.ancho_escena, self.alto_escena),
+            # Cada cambio de la región visible (scroll, zoom, tamaño de ventana) recalcula qué se dibuja
+            yscrollcommand=lambda *args: (scroll_y.set(*args), self.actualizar_vista()),
+            xscrollcommand=lambda *args: (scroll_x.set(*args), self.actualizar_vista())
         )
-        self.canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-        
+        scroll_y.config(command=self.canvas.yview)
+        scroll_x.config(command=self.canvas.xview)
+        scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
+        scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        # Rueda: scroll vertical (Shift: horizontal, Ctrl: zoom). Linux usa los botones 4 y 5
+        self.canvas.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self.canvas.xview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Control-MouseWheel>", lambda e: self.cambiar_zoom(PASO_ZOOM if e.delta > 0 else 1 / PASO_ZOOM))
+        self.canvas.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+        self.canvas.bind("<Control-Button-4>", lambda e: self.cambiar_zoom(PASO_ZOOM))
+        self.canvas.bind("<Control-Button-5>", lambda e: self.cambiar_zoom(1 / PASO_ZOOM))
+        
+        self.motor = MotorEventos(self.cajas)
+        self.cajas_visibles = list(self.cajas)
         self.simulacion_corriendo = True
         self.ultimo_tiempo = time.time()
         self.actualizar_simulacion()
@@ -346,33 +417,127 @@ class SimulacionApp:
         """Bucle principal de actualización de la simulación."""
         if not self.simulacion_corriendo:
             return
+        self.id_tick = None
         
         tiempo_actual = time.time()
         dt = tiempo_actual - self.ultimo_tiempo
         self.ultimo_tiempo = tiempo_actual
         
-        if not self.simulacion_terminada:
-            todas_vacias = True
-            for caja in self.cajas:
-                caja.actualizar(dt)
-                if caja.tiene_clientes():
-                    todas_vacias = False
-            
-            if todas_vacias:
-                self.simulacion_terminada = True
-                self.label_estado.config(text="✓ Simulación Terminada", fg="#F44336")
+        if not self.simulacion_terminada and not self.pausado:
+            self.motor.avanzar(dt * VELOCIDAD_SIMULACION * self.velocidad)
+        self.refrescar_escena()
+        
+        if self.simulacion_terminada or self.pausado:
+            return  # Terminada o en pausa: no se programan más cuadros
         
-        self.canvas.delete("caja")
+        # Frecuencia adaptativa: se espera hasta el próximo cambio de alguna caja visible
+        esperas = [t for t in (caja.tiempo_hasta_cambio() for caja in self.cajas_visibles) if t is not None]
+        espera_ms = int(min(esperas, default=INTERVALO_MAXIMO_MS / 1000) / self.velocidad * 1000) + 1
+        self.id_tick = self.root.after(min(INTERVALO_MAXIMO_MS, max(INTERVALO_MINIMO_MS, espera_ms)), self.actualizar_simulacion)
+    
+    def refrescar_escena(self):
+        """Dibuja las cajas con cambios pendientes, el reloj y detecta el fin de la simulación."""
+        if not self.simulacion_terminada and self.motor.terminado():
+            self.simulacion_terminada = True
+            self.label_estado.config(text="✓ Simulación Terminada", fg="#F44336")
+            for boton in self.botones_reproduccion:
+                boton.config(state=tk.DISABLED)
+            self.dibujar_mensaje_final()
+        
+        # Solo las cajas visibles se llevan al reloj y se dibujan (si tienen cambios pendientes);
+        # las demás acumulan sus cambios hasta entrar en la vista (ver actualizar_vista)
+        self.motor.sincronizar(self.cajas_visibles)
+        for caja in self.cajas_visibles:
+            if caja.cambios:
+                caja.dibujar(self.canvas)
+        self.label_reloj.config(text=f"⏱ t = {self.motor.reloj:.1f} s simulados")
+    
+    def alternar_pausa(self):
+        """Pausa o reanuda el avance en tiempo real."""
+        if self.simulacion_terminada:
+            return
+        self.pausado = not self.pausado
+        if self.pausado:
+            if self.id_tick is not None:
+                self.root.after_cancel(self.id_tick)
+                self.id_tick = None
+            self.btn_pausa.config(text="▶ Reanudar")
+            self.label_estado.config(text="⏸ En pausa", fg="#FF9800")
+        else:
+            self.btn_pausa.config(text="⏸ Pausa")
+            self.label_estado.config(text="● En ejecución", fg="#4CAF50")
+            self.ultimo_tiempo = time.time()
+            self.actualizar_simulacion()
+    
+    def siguiente_evento(self):
+        """Pausa la simulación y salta al próximo fin de atención."""
+        if self.simulacion_terminada:
+            return
+        if not self.pausado:
+            self.alternar_pausa()
+        self.motor.siguiente_evento()
+        self.refrescar_escena()
+    
+    def ir_al_final(self):
+        """Procesa todos los eventos restantes de una vez y muestra el estado final."""
+        if self.id_tick is not None:
+            self.root.after_cancel(self.id_tick)
+            self.id_tick = None
+        self.motor.ir_al_final()
+        self.refrescar_escena()
+    
+    def cambiar_velocidad(self, velocidad):
+        """
+        Cambia la velocidad de reproducción.
+        
+        Args:
+            velocidad: Multiplicador sobre VELOCIDAD_SIMULACION.
+        """
+        self.velocidad = velocidad
+    
+    def actualizar_vista(self):
+        """Informa a cada caja la región visible, recalcula las cajas visibles y redibuja las que cambiaron."""
+        if not self.cajas:
+            return
+        x_min = self.canvas.canvasx(0) / self.escala
+        x_max = self.canvas.canvasx(self.canvas.winfo_width()) / self.escala
+        y_min = self.canvas.canvasy(0) / self.escala
+        y_max = self.canvas.canvasy(self.canvas.winfo_height()) / self.escala
         for caja in self.cajas:
-            caja.dibujar(self.canvas)
+            caja.cambiar_vista(x_min, x_max, y_min, y_max, self.escala)
+        self.cajas_visibles = [caja for caja in self.cajas if caja.visible()]
+        if self.motor:
+            self.motor.sincronizar(self.cajas_visibles)
+        for caja in self.cajas:
+            if caja.cambios:
+                caja.dibujar(self.canvas)
+    
+    def cambiar_zoom(self, factor):
+        """
+        Aplica zoom a la escena: se borra el canvas y cada caja vuelve a crear
+        sus items a la nueva escala (solo los visibles).
         
+        Args:
+            factor: Multiplicador sobre la escala actual.
+        """
+        escala = min(ZOOM_MAXIMO, max(ZOOM_MINIMO, self.escala * factor))
+        if escala == self.escala:
+            return
+        self.escala = escala
+        self.canvas.delete("all")
+        self.canvas.config(scrollregion=(0, 0, self.ancho_escena * escala, self.alto_escena * escala))
+        self.actualizar_vista()
         if self.simulacion_terminada:
-            self.canvas.create_text(
-                ANCHO_PANTALLA // 2, ALTO_PANTALLA // 2,
-                text="✅ SIMULACIÓN COMPLETADA\nTodas las cajas están vacías",
-                font=("Arial", 24, "bold"),
-                fill=COLOR_BOTON,
-                tags="caja"
-            )
-        
-        self.root.after(33, self.actualizar_simulacion)  # ~30 FPS
+            self.dibujar_mensaje_final()
+    
+    def dibujar_mensaje_final(self):
+        """Muestra el mensaje de simulación completada en el centro de la región visible."""
+        self.canvas.delete("mensaje_final")
+        self.canvas.create_text(
+            self.canvas.canvasx(self.canvas.winfo_width() // 2),
+            self.canvas.canvasy(self.canvas.winfo_height() // 2),
+            text="✅ SIMULACIÓN COMPLETADA\nTodas las cajas están vacías",
+            font=("Arial", 24, "bold"),
+            fill=COLOR_BOTON,
+            tags="mensaje_final"
+        )
@@ -0,0 +1,93 @@
+"""
+Módulo del motor de eventos discretos de la simulación visual.
+Lleva un reloj común, avanza solo las cajas con fines de atención y salta
+directo al próximo fin de atención cuando se pide.
+"""
+
+import heapq
+
+
+class MotorEventos:
+    """Reloj común de las cajas con una cola de prioridad de fines de atención."""
+
+    def __init__(self, cajas):
+        """
+        Inicializa el motor y empieza a atender en todas las cajas.
+
+        Args:
+            cajas: Lista de objetos Caja (con sus filas ya cargadas).
+        """
+        self.cajas = cajas
+        self.reloj = 0.0
+        self.eventos = []  # Heap de (instante de fin de atención, índice de caja)
+
+        for indice, caja in enumerate(cajas):
+            caja.avanzar_hasta(self.reloj)
+            self.programar(indice)
+
+    def programar(self, indice):
+        """Agrega al heap el fin de la atención en curso de la caja, si lo hay."""
+        caja = self.cajas[indice]
+        if caja.cliente_actual:
+            heapq.heappush(self.eventos, (caja.fin_atencion, indice))
+
+    def proximo_evento(self):
+        """Instante del próximo fin de atención, o None si todas las cajas terminaron."""
+        return self.eventos[0][0] if self.eventos else None
+
+    def terminado(self):
+        """Retorna True si ya no quedan clientes en ninguna caja."""
+        return not self.eventos
+
+    def avanzar_hasta(self, instante):
+        """
+        Procesa en orden todos los fines de atención hasta el instante indicado.
+
+        Solo se tocan las cajas con eventos (O(log n) por evento, sin recorrer
+        las demás). El reloj de las cajas sin eventos queda atrasado hasta que
+        se las sincroniza (ver sincronizar), lo que solo cambia el tiempo
+        restante que muestran. Con instante = float('inf') salta al final y el
+        reloj queda en el último evento.
+
+        Args:
+            instante: Tiempo simulado (segundos) al que se avanza.
+        """
+        while self.eventos and self.eventos[0][0] <= instante:
+            fin, indice = heapq.heappop(self.eventos)
+            self.reloj = fin
+            self.cajas[indice].avanzar_hasta(fin)
+            self.programar(indice)
+
+        if instante != float('inf'):
+            self.reloj = max(self.reloj, instante)
+
+    def sincronizar(self, cajas):
+        """
+        Lleva al reloj común las cajas indicadas (p. ej. las visibles) para
+        actualizar su tiempo restante. No procesa eventos: los que vencían ya
+        los atendió avanzar_hasta.
+
+        Args:
+            cajas: Cajas a sincronizar.
+        """
+        for caja in cajas:
+            if caja.reloj < self.reloj:
+                caja.avanzar_hasta(self.reloj)
+
+    def avanzar(self, segundos):
+        """
+        Avanza el reloj una cantidad de segundos simulados.
+
+        Args:
+            segundos: Tiempo simulado a avanzar.
+        """
+        self.avanzar_hasta(self.reloj + segundos)
+
+    def siguiente_evento(self):
+        """Salta al próximo fin de atención (paso a paso)."""
+        if self.eventos:
+            self.avanzar_hasta(self.eventos[0][0])
+
+    def ir_al_final(self):
+        """Procesa todos los eventos restantes y deja las cajas vacías."""
+        self.avanzar_hasta(float('inf'))